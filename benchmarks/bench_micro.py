@@ -0,0 +1,272 @@
+"""
+Microbenchmarks for the non-vision hot paths, with stored baselines.
+
+Each benchmark reports the best time per call over several repeats. Results
+are compared against a baseline file and the run fails (exit status 1) when any
+benchmark is slower than its baseline by more than the threshold. Baselines are
+machine-specific: record them on the target hardware with --save-baseline.
+
+Usage:
+    python -m benchmarks.bench_micro                      # compare with benchmarks/baselines.json
+    python -m benchmarks.bench_micro --threshold 0.1      # fail on a >10% slowdown
+    python -m benchmarks.bench_micro --save-baseline      # record new baselines
+    python -m benchmarks.bench_micro --only order --quick
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.feedback import StorageManager
+from core.gesture import HandTracker, landmarks_to_array
+from core.order import Order
+from storage.database import DatabaseManager
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Registers a benchmark. The decorated function receives the size scale and a
+    scratch directory and returns (function to time, number of calls per timing).
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _synthetic_results(n_hands=2, seed=0):
+    """Mediapipe-like results with random landmarks, for the landmark helpers."""
+    rng = np.random.default_rng(seed)
+    return SimpleNamespace(multi_hand_landmarks=[
+        SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in rng.random((21, 3)).tolist()])
+        for _ in range(n_hands)
+    ])
+
+
+def _sample_order(i):
+    return {"Burger": {"quantity": 1 + i % 3, "price": 5}, "Coke": {"quantity": 2, "price": 2},
+            f"Special {i % 50}": {"quantity": 1, "price": 7.5}}
+
+
+@benchmark("gesture.landmarks_to_array")
+def bench_landmarks_to_array(scale, workdir):
+    results = _synthetic_results()
+    return (lambda: landmarks_to_array(results.multi_hand_landmarks)), 1000
+
+
+@benchmark("gesture.find_positions")
+def bench_find_positions(scale, workdir):
+    tracker = HandTracker()
+    tracker.landmarks = landmarks_to_array(_synthetic_results().multi_hand_landmarks)
+    image = np.zeros((720, 1280, 3), dtype=np.uint8)
+    return (lambda: tracker.find_positions(image)), 1000
+
+
+@benchmark("gesture.fingers_up")
+def bench_fingers_up(scale, workdir):
+    tracker = HandTracker()
+    tracker.landmarks = landmarks_to_array(_synthetic_results().multi_hand_landmarks)
+    lm_list, _ = tracker.find_positions(np.zeros((720, 1280, 3), dtype=np.uint8))
+    return (lambda: tracker.fingers_up(lm_list)), 1000
+
+
+@benchmark("order.add_remove")
+def bench_order_add_remove(scale, workdir):
+    items = [f"item-{i}" for i in range(int(100000 * scale))]
+
+    def run():
+        order = Order()
+        for item in items:
+            order.add_item(item, price=1)
+        for item in items:
+            order.remove_item(item)
+    return run, 1
+
+
+@benchmark("order.add_existing")
+def bench_order_add_existing(scale, workdir):
+    order = Order()
+    for i in range(int(100000 * scale)):
+        order.add_item(f"item-{i}", price=1)
+
+    def run():
+        order.add_item("item-0")
+        order.decrement("item-0")
+    return run, 10000
+
+
+def _fresh_copy(template, workdir, name):
+    """
+    Copies a fixture and its side files, so every benchmark starts from the same
+    unmodified data whatever ran before it.
+    """
+    path = os.path.join(workdir, name)
+    for suffix in ("", ".idx", "-wal"):
+        if os.path.exists(template + suffix):
+            shutil.copyfile(template + suffix, path + suffix)
+    return path
+
+
+def _storage_log(scale, workdir, name):
+    """Returns a fresh copy of a multi-MB order log (about 8 MB at scale 1)."""
+    template = os.path.join(workdir, "template.jsonl")
+    if not os.path.exists(template):
+        with StorageManager(template) as log:
+            log.save_orders([_sample_order(i) for i in range(int(100000 * scale))])
+    return _fresh_copy(template, workdir, f"{name}.jsonl")
+
+
+@benchmark("storage.save_order")
+def bench_storage_save_order(scale, workdir):
+    log = StorageManager(_storage_log(scale, workdir, "save_order"))
+    order = _sample_order(0)
+
+    def run():
+        for _ in range(100):
+            log.save_order(order)
+        log.flush()
+    return run, 1
+
+
+@benchmark("storage.load_orders")
+def bench_storage_load_orders(scale, workdir):
+    log = StorageManager(_storage_log(scale, workdir, "load_orders"))
+    return log.load_orders, 1
+
+
+def _database(scale, workdir, name):
+    """Returns a fresh copy of a database holding 100k orders (at scale 1)."""
+    template = os.path.join(workdir, "template.db")
+    if not os.path.exists(template):
+        db = DatabaseManager(template)
+        db.create_order_table()
+        orders = [_sample_order(i) for i in range(int(100000 * scale))]
+        for start in range(0, len(orders), 5000):
+            db.insert_orders(orders[start:start + 5000])
+        db.close()
+    return _fresh_copy(template, workdir, f"{name}.db")
+
+
+@benchmark("database.insert_order")
+def bench_database_insert_order(scale, workdir):
+    db = DatabaseManager(_database(scale, workdir, "insert_order"))
+    order = _sample_order(0)
+    return (lambda: db.insert_order(order)), 50
+
+
+@benchmark("database.retrieve_orders")
+def bench_database_retrieve_orders(scale, workdir):
+    db = DatabaseManager(_database(scale, workdir, "retrieve_orders"))
+    return db.retrieve_orders, 1
+
+
+@benchmark("tray.handle_selection")
+def bench_handle_selection(scale, workdir):
+    from main1 import TouchlessTray
+
+    app = TouchlessTray()
+    rng = np.random.default_rng(0)
+    points = list(zip(rng.integers(0, 1280, 1000).tolist(), rng.integers(0, 720, 1000).tolist()))
+    states = list(app.layouts)
+
+    def run():
+        for i, (x, y) in enumerate(points):
+            app.current_state = states[i % len(states)]
+            app.handle_selection(x, y)
+        app.order.clear()
+    return run, 1
+
+
+def run_benchmarks(names, scale=1.0, repeat=5):
+    """
+    Runs benchmarks in a scratch directory.
+    :param names: Benchmark names.
+    :param scale: Multiplier for the data sizes (orders, rows, items).
+    :param repeat: Timings per benchmark; the best one is kept.
+    :return: Dict of name -> best seconds per call.
+    """
+    workdir = tempfile.mkdtemp(prefix="bench_micro_")
+    results = {}
+    try:
+        for name in names:
+            fn, number = BENCHMARKS[name](scale, workdir)
+            fn()  # Warm caches and lazy imports
+            results[name] = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+            print(f"  {name:<30}{results[name] * 1e6:>14.2f} us/call")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baselines, threshold):
+    """
+    Compares results with baselines.
+    :return: List of (name, baseline, result, ratio) for every benchmark slower than allowed.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline and seconds > baseline * (1 + threshold):
+            regressions.append((name, baseline, seconds, seconds / baseline))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baselines.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown before failing, as a fraction (default 0.25 = 25%%).")
+    parser.add_argument("--only", help="Run only benchmarks whose name starts with this text (e.g. order).")
+    parser.add_argument("--quick", action="store_true", help="Use 1/10 of the data sizes (not comparable to baselines).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per benchmark.")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.only or name.startswith(args.only)]
+    scale = 0.1 if args.quick else 1.0
+    print(f"Running {len(names)} benchmarks (scale {scale}):")
+    results = run_benchmarks(names, scale, args.repeat)
+
+    baseline_data = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline_data = json.load(file)
+
+    if args.save_baseline:
+        baseline_data.setdefault("results", {}).update(results)
+        baseline_data["machine"] = f"{platform.node()} {platform.machine()} Python {platform.python_version()}"
+        with open(args.baseline, "w") as file:
+            json.dump(baseline_data, file, indent=2, sort_keys=True)
+        print(f"Baselines saved to {args.baseline}")
+        return 0
+
+    if args.quick:
+        print("Quick run: baselines not checked.")
+        return 0
+    if not baseline_data:
+        print(f"No baselines at {args.baseline}; record them with --save-baseline.")
+        return 0
+
+    regressions = compare(results, baseline_data.get("results", {}), args.threshold)
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSION: {len(regressions)} benchmark(s) slower than baseline "
+              f"by more than {args.threshold:.0%} (baselines from {baseline_data.get('machine', 'unknown')}):")
+        for name, baseline, seconds, ratio in regressions:
+            print(f"  {name:<30}{baseline * 1e6:>12.2f} -> {seconds * 1e6:.2f} us/call ({ratio:.2f}x)")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Offline end-to-end pipeline benchmark.
+
+Replays a video file (or synthetic frames) through the hand tracking and tray
+pipelines without opening a window, and reports FPS and p50/p95/p99 latency
+per stage so releases and config changes can be compared on identical input.
+
+Usage:
+    python -m benchmarks.bench_pipeline recording.mp4 [more.mp4 ...]
+    python -m benchmarks.bench_pipeline synthetic:1280x720:300 --json results.json
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from core.capture import open_capture
+
+
+class StageTimer:
+    def __init__(self):
+        """
+        Collects per-stage wall-clock samples in seconds.
+        """
+        self.samples = {}
+
+    def record(self, stage, elapsed):
+        """
+        Records one sample for a stage.
+        :param stage: Stage name.
+        :param elapsed: Duration in seconds.
+        """
+        self.samples.setdefault(stage, []).append(elapsed)
+
+    def summary(self):
+        """
+        Summarizes every stage.
+        :return: Dict of stage -> {count, fps, mean_ms, p50_ms, p95_ms, p99_ms}.
+        """
+        report = {}
+        for stage, samples in self.samples.items():
+            values = np.asarray(samples) * 1000.0
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            report[stage] = {
+                "count": len(values),
+                "fps": 1000.0 / values.mean() if values.mean() > 0 else float("inf"),
+                "mean_ms": float(values.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+            }
+        return report
+
+
+def _timed(timer, stage, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timer.record(stage, time.perf_counter() - start)
+    return result
+
+
+def _sweep_pointer(index, frame):
+    """Deterministic fingertip path that visits every button column and row."""
+    h, w = frame.shape[:2]
+    return (int((index * 53) % w), int((index * 29) % h))
+
+
+def bench_hand_tracker(source, max_frames=None):
+    """
+    Runs HandTracker.find_hands and find_positions over a frame source.
+    :param source: Source spec accepted by open_capture.
+    :param max_frames: Optional cap on the number of frames processed.
+    :return: Tuple (StageTimer, total_seconds, frames).
+    """
+    from core.gesture import HandTracker
+
+    tracker = HandTracker()
+    timer = StageTimer()
+    timer.record("warm_up", tracker.warm_up())
+    cap = open_capture(source)
+    frames = 0
+    start = time.perf_counter()
+    while max_frames is None or frames < max_frames:
+        frame_start = time.perf_counter()
+        ret, frame = _timed(timer, "capture", cap.read)
+        if not ret:
+            break
+        frame = _timed(timer, "find_hands", tracker.find_hands, frame)
+        lm_list, bbox = _timed(timer, "find_positions", tracker.find_positions, frame)
+        if lm_list:
+            _timed(timer, "fingers_up", tracker.fingers_up, lm_list)
+        timer.record("frame", time.perf_counter() - frame_start)
+        frames += 1
+    total = time.perf_counter() - start
+    cap.release()
+    return timer, total, frames
+
+
+def bench_touchless_tray(source, max_frames=None, sweep_pointer=False):
+    """
+    Runs TouchlessTray.detect_hand_position and its render/selection path over a frame source.
+    :param source: Source spec accepted by open_capture.
+    :param max_frames: Optional cap on the number of frames processed.
+    :param sweep_pointer: Drive selection with a scripted fingertip when no hand is detected,
+                          so synthetic input still exercises handle_selection.
+    :return: Tuple (StageTimer, total_seconds, frames).
+    """
+    from main1 import TouchlessTray
+
+    app = TouchlessTray()
+    timer = StageTimer()
+    timer.record("warm_up", app.warm_up())
+    cap = open_capture(source)
+    frames = 0
+    start = time.perf_counter()
+    while max_frames is None or frames < max_frames:
+        frame_start = time.perf_counter()
+        ret, frame = _timed(timer, "capture", cap.read)
+        if not ret:
+            break
+        frame = _timed(timer, "flip", cv2.flip, frame, 1)
+        hand_pos = _timed(timer, "detect_hand_position", app.detect_hand_position, frame)
+        _timed(timer, "render", app.render, frame)
+        if hand_pos is None and sweep_pointer:
+            hand_pos = _sweep_pointer(frames, frame)
+        if hand_pos:
+            if not _timed(timer, "handle_selection", app.handle_selection, *hand_pos):
+                # The pointer hit Exit; keep benchmarking from the main menu.
+                app.current_state = "MainMenu"
+        timer.record("frame", time.perf_counter() - frame_start)
+        frames += 1
+    total = time.perf_counter() - start
+    cap.release()
+    return timer, total, frames
+
+
+def _print_report(title, timer, total, frames):
+    print(f"\n{title}: {frames} frames in {total:.2f}s ({frames / total if total else 0:.1f} FPS)")
+    print(f"  {'stage':<22}{'count':>8}{'fps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, stats in timer.summary().items():
+        print(
+            f"  {stage:<22}{stats['count']:>8}{stats['fps']:>10.1f}"
+            f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*", default=["synthetic"],
+                        help="Video files, camera indexes or synthetic[:WxH[:FRAMES]] specs.")
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop after this many frames per source.")
+    parser.add_argument("--only", choices=["tracker", "tray"], help="Run only one of the pipelines.")
+    parser.add_argument("--sweep-pointer", action="store_true",
+                        help="Drive handle_selection with a scripted fingertip when no hand is found.")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for source in args.sources:
+        runs = []
+        if args.only in (None, "tracker"):
+            runs.append(("HandTracker", bench_hand_tracker(source, args.max_frames)))
+        if args.only in (None, "tray"):
+            runs.append(("TouchlessTray", bench_touchless_tray(source, args.max_frames, args.sweep_pointer)))
+        for name, (timer, total, frames) in runs:
+            _print_report(f"{name} [{source}]", timer, total, frames)
+            results.setdefault(source, {})[name] = {
+                "frames": frames,
+                "seconds": total,
+                "fps": frames / total if total else 0.0,
+                "stages": timer.summary(),
+            }
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class SyntheticCapture:
+    def __init__(self, width=1280, height=720, frames=300, seed=0):
+        """
+        Frame source with the cv2.VideoCapture read() interface that generates
+        deterministic synthetic frames, for benchmarking without a camera.
+        :param width: Frame width in pixels.
+        :param height: Frame height in pixels.
+        :param frames: Number of frames to produce before reporting end of stream.
+        :param seed: Seed for the noise pattern, so runs are reproducible.
+        """
+        rng = np.random.default_rng(seed)
+        base = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        # A handful of distinct frames is enough to defeat caching; cycle through them.
+        self._frames = [np.roll(base, shift * 37, axis=1) for shift in range(8)]
+        self.total_frames = frames
+        self.position = 0
+
+    def isOpened(self):
+        return self.position < self.total_frames
+
+    def read(self, image=None):
+        """
+        Returns the next frame, like a camera read.
+        :param image: Optional array to read into, reused when its shape matches.
+        :return: Tuple (success, frame).
+        """
+        if self.position >= self.total_frames:
+            return False, None
+        source = self._frames[self.position % len(self._frames)]
+        self.position += 1
+        if image is None or image.shape != source.shape or image.dtype != source.dtype:
+            return True, source.copy()
+        np.copyto(image, source)
+        return True, image
+
+    def release(self):
+        self.position = self.total_frames
+
+
+def read_frame(cap, image=None):
+    """
+    Reads the next frame, into image when given (cv2.VideoCapture.read(image) reuses
+    the array when its shape matches instead of allocating a new one).
+    :param cap: Frame source.
+    :param image: Array from a previous read, or None.
+    :return: Tuple (success, frame).
+    """
+    return cap.read() if image is None else cap.read(image)
+
+
+class FrameBufferPool:
+    def __init__(self, size=4):
+        """
+        Free list of frame arrays, so frames handed between threads are recycled
+        instead of allocated per frame. acquire() returns None while the pool is
+        empty; passing that to a dst= argument lets OpenCV allocate the array,
+        which joins the pool once it is released.
+        :param size: Maximum number of idle buffers kept.
+        """
+        self.size = size
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes an idle buffer.
+        :return: An array, or None if no buffer is idle.
+        """
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def release(self, buffer):
+        """
+        Returns a buffer once nothing references it anymore.
+        :param buffer: Array obtained from acquire() or allocated in its place.
+        """
+        with self._lock:
+            if buffer is not None and len(self._free) < self.size:
+                self._free.append(buffer)
+
+
+def open_capture(source=0):
+    """
+    Opens a frame source.
+    :param source: Camera index (int or digit string), a video file path, or
+                   "synthetic[:WIDTHxHEIGHT[:FRAMES]]" for generated frames.
+    :return: An object with the cv2.VideoCapture read()/release() interface.
+    """
+    if isinstance(source, str):
+        if source.isdigit():
+            return cv2.VideoCapture(int(source))
+        if source.startswith("synthetic"):
+            parts = source.split(":")
+            width, height, frames = 1280, 720, 300
+            if len(parts) > 1 and parts[1]:
+                width, height = (int(v) for v in parts[1].lower().split("x"))
+            if len(parts) > 2 and parts[2]:
+                frames = int(parts[2])
+            return SyntheticCapture(width, height, frames)
+    return cv2.VideoCapture(source)
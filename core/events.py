@@ -0,0 +1,171 @@
+import math
+import time
+from collections import namedtuple
+
+# kind is one of "enter", "hover", "select" or "leave"; target is whatever hit_test returned.
+GestureEvent = namedtuple("GestureEvent", ["kind", "target", "x", "y", "timestamp"])
+
+
+class EmaFilter:
+    def __init__(self, alpha=0.5):
+        """
+        Exponential moving average over a 2D point.
+        :param alpha: Weight of the newest sample (1.0 disables smoothing).
+        """
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self._state = None
+
+    def __call__(self, point, timestamp):
+        if self._state is None:
+            self._state = (float(point[0]), float(point[1]))
+        else:
+            a = self.alpha
+            self._state = (a * point[0] + (1 - a) * self._state[0], a * point[1] + (1 - a) * self._state[1])
+        return self._state
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.0, beta=0.007, d_cutoff=1.0):
+        """
+        One-Euro filter over a 2D point: heavy smoothing while the fingertip is
+        nearly still, light smoothing (low lag) while it moves quickly.
+        :param min_cutoff: Minimum cutoff frequency in Hz; lower removes more jitter.
+        :param beta: Speed coefficient; higher reduces lag during fast movements.
+        :param d_cutoff: Cutoff frequency in Hz for the speed estimate.
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._point = None
+        self._speed = (0.0, 0.0)
+        self._timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, point, timestamp):
+        if self._point is None:
+            self._point = (float(point[0]), float(point[1]))
+            self._timestamp = timestamp
+            return self._point
+
+        dt = max(timestamp - self._timestamp, 1e-6)
+        self._timestamp = timestamp
+        a_d = self._alpha(self.d_cutoff, dt)
+        smoothed = []
+        speeds = []
+        for value, previous, previous_speed in zip(point, self._point, self._speed):
+            speed = a_d * (value - previous) / dt + (1 - a_d) * previous_speed
+            a = self._alpha(self.min_cutoff + self.beta * abs(speed), dt)
+            smoothed.append(a * value + (1 - a) * previous)
+            speeds.append(speed)
+        self._point = tuple(smoothed)
+        self._speed = tuple(speeds)
+        return self._point
+
+
+class GestureEventEngine:
+    def __init__(self, hit_test, dwell_time=0.8, cooldown=1.0, exit_grace=0.15, repeat=False, smoothing=None):
+        """
+        Turns a per-frame fingertip position into discrete gesture events.
+        :param hit_test: Function (x, y) -> target or None, e.g. ScreenLayout.hit_test.
+        :param dwell_time: Seconds the fingertip must stay on a target before it is selected.
+        :param cooldown: Minimum seconds between two selections.
+        :param exit_grace: Seconds the fingertip may leave a target (or be lost) before it counts as leaving.
+        :param repeat: Whether holding on a target keeps selecting it every dwell_time.
+        :param smoothing: Point filter called as filter(point, timestamp); defaults to a One-Euro filter.
+        """
+        self.hit_test = hit_test
+        self.dwell_time = dwell_time
+        self.cooldown = cooldown
+        self.exit_grace = exit_grace
+        self.repeat = repeat
+        self.smoothing = smoothing if smoothing is not None else OneEuroFilter()
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the current target and smoothing state, e.g. after a screen change.
+        """
+        self.smoothing.reset()
+        self.target = None
+        self.point = None
+        self._entered_at = 0.0
+        self._armed = True
+        self._hold = False  # Keep new targets disarmed until the fingertip has left every target
+        self._pending_since = None
+        self._next_select_at = 0.0
+
+    def disarm(self):
+        """
+        Disarms the current target and every target entered until the fingertip has
+        left all of them, e.g. after a screen change puts a new button under a still fingertip.
+        """
+        self._armed = False
+        self._hold = True
+
+    def dwell_progress(self, timestamp=None):
+        """
+        Fraction of the dwell time spent on the current target, for progress indicators.
+        :param timestamp: Current time (defaults to time.perf_counter()).
+        :return: Value in [0, 1].
+        """
+        if self.target is None or not self._armed:
+            return 0.0
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        return min(1.0, (timestamp - self._entered_at) / self.dwell_time)
+
+    def update(self, point, timestamp=None):
+        """
+        Feeds one frame's fingertip position.
+        :param point: (x, y) fingertip position in pixels, or None when no hand is visible.
+        :param timestamp: Frame time in seconds (defaults to time.perf_counter()).
+        :return: List of GestureEvent produced by this frame (usually empty or a single hover).
+        """
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        events = []
+
+        if point is None:
+            self.smoothing.reset()
+            candidate = None
+        else:
+            self.point = self.smoothing(point, timestamp)
+            candidate = self.hit_test(*self.point)
+
+        if candidate is self.target:
+            self._pending_since = None
+        else:
+            # Hysteresis: only switch away from a target once the change has persisted.
+            if self._pending_since is None:
+                self._pending_since = timestamp
+            if self.target is None or timestamp - self._pending_since >= self.exit_grace:
+                if self.target is not None:
+                    events.append(GestureEvent("leave", self.target, *self.point, timestamp))
+                self.target = candidate
+                self._pending_since = None
+                if candidate is not None:
+                    self._entered_at = timestamp
+                    self._armed = not self._hold
+                    events.append(GestureEvent("enter", candidate, *self.point, timestamp))
+
+        if self.target is None:
+            self._hold = False  # Left every target (or lost the hand) for longer than exit_grace
+
+        if self.target is not None and point is not None:
+            events.append(GestureEvent("hover", self.target, *self.point, timestamp))
+            if (self._armed and timestamp - self._entered_at >= self.dwell_time
+                    and timestamp >= self._next_select_at):
+                events.append(GestureEvent("select", self.target, *self.point, timestamp))
+                self._next_select_at = timestamp + self.cooldown
+                self._entered_at = timestamp
+                self._armed = self.repeat
+
+        return events
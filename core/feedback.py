@@ -1,28 +1,343 @@
+import atexit
+import math
 import os
 import json
+import struct
+import threading
+import time
+
+# One index entry per order: byte offset of its line in the log and the time it was saved.
+INDEX_ENTRY = struct.Struct("<Qd")
+# Save times of lines indexed after the fact, which record no time of their own:
+# -inf before the first timed order (a log older than its index), NaN after it (lines
+# whose index entries were lost in a crash). Neither matches a time range.
+UNTIMED_BEFORE = float("-inf")
+UNTIMED = float("nan")
+
 
 class StorageManager:
-    def __init__(self, file_path):
+    def __init__(self, file_path, flush_every=64, flush_interval=0.05, fsync=False):
+        """
+        Append-only JSON-lines order log with a side offset index.
+        Writes go through one persistent handle and are group-committed: they are
+        flushed once flush_every orders are pending or flush_interval seconds after
+        the first pending one, whichever comes first. The index file
+        (file_path + ".idx") holds a fixed-size (offset, timestamp) entry per order,
+        so order K or a time range can be reached with a seek instead of a full scan.
+        Only a handle that writes the log writes the index; a read-only handle indexes
+        lines past the end of the index in memory, since a writer may still append them.
+        :param file_path: Path of the JSON-lines log.
+        :param flush_every: Maximum number of orders buffered before a flush.
+        :param flush_interval: Maximum seconds an order stays buffered.
+        :param fsync: Also fsync on every flush (durable across power loss, slower).
+        """
         self.file_path = file_path
+        self.index_path = file_path + ".idx"
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._file = None
+        self._index_file = None
+        self._offset = 0
+        self._pending_index = []  # (offset, timestamp) of orders written but not flushed
+        self._timer = None
+        self._indexed = 0  # Valid entries in the index file, as of the last sync
+        self._unindexed = []  # (offset, timestamp) of later lines, indexed in memory by readers
+
+    def _open(self):
+        """Opens the log and index for appending, first bringing the index up to date."""
+        if self._file is None:
+            self._recover_index(repair=True)
+            self._file = open(self.file_path, "ab")
+            self._index_file = open(self.index_path, "ab")
+            self._offset = self._file.tell()
+            atexit.register(self.close)  # Flush what is still buffered at exit
+
+    def _recover_index(self, repair=False):
+        """
+        Makes the index match the log: drops entries past the end of the log and
+        indexes complete lines written after the last entry (e.g. after a crash or
+        for a log created before the index existed).
+        :param repair: Also cut off a torn last line; only done before appending.
+        """
+        if not os.path.exists(self.file_path):
+            return
+        log_size = os.path.getsize(self.file_path)
+        count = self._index_count()
+        with open(self.index_path, "ab+") as index:
+            # Drop a torn trailing entry and entries pointing past the end of the log
+            while count and self._index_entry(count - 1)[0] >= log_size:
+                count -= 1
+            index.truncate(count * INDEX_ENTRY.size)
+            if not log_size:
+                return
+
+            entries, offset = self._index_lines(self._index_entry(count - 1) if count else None)
+            index.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in entries))
+            # A torn last line would corrupt the next append, so cut it off
+            if repair and offset < log_size:
+                with open(self.file_path, "rb+") as log:
+                    log.truncate(offset)
+
+    def _index_lines(self, after=None):
+        """
+        Indexes the complete lines of the log after a given index entry. Their save
+        times are unknown, so they are marked untimed (see UNTIMED_BEFORE and UNTIMED).
+        :param after: (offset, timestamp) entry of the last indexed line, or None to start at the beginning.
+        :return: List of (offset, timestamp) and the end offset of the last complete line.
+        """
+        entries = []
+        untimed = UNTIMED_BEFORE if after is None or after[1] == UNTIMED_BEFORE else UNTIMED
+        with open(self.file_path, "rb") as log:
+            if after is not None:
+                log.seek(after[0])
+                log.readline()  # Already indexed
+            offset = log.tell()
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break  # Incomplete last line; left for the next writer to overwrite
+                entries.append((offset, untimed))
+                offset += len(line)
+        return entries, offset
+
+    def _index_count(self):
+        if not os.path.exists(self.index_path):
+            return 0
+        return os.path.getsize(self.index_path) // INDEX_ENTRY.size
+
+    def _index_entry(self, k):
+        """Reads the (offset, timestamp) entry of order k from the index file."""
+        with open(self.index_path, "rb") as index:
+            index.seek(k * INDEX_ENTRY.size)
+            return INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+
+    def _entry(self, k):
+        """Returns the (offset, timestamp) entry of order k, from the index file or the in-memory tail."""
+        if k < self._indexed:
+            return self._index_entry(k)
+        return self._unindexed[k - self._indexed]
 
     def save_order(self, order):
         """Save the current order to a file."""
         try:
-            with open(self.file_path, 'a') as file:
-                json.dump(order, file)
-                file.write("\n")
+            self.save_orders([order])
         except Exception as e:
             print(f"Error saving order: {e}")
 
+    def save_orders(self, orders):
+        """
+        Appends several orders as one group; errors are raised to the caller.
+        :param orders: Iterable of JSON-serializable orders.
+        """
+        with self._lock:
+            self._open()
+            now = time.time()
+            for order in orders:
+                line = (json.dumps(order) + "\n").encode("utf-8")
+                self._file.write(line)
+                self._pending_index.append((self._offset, now))
+                self._offset += len(line)
+            if len(self._pending_index) >= self.flush_every:
+                self.flush()
+            elif self._pending_index and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """
+        Writes buffered orders to disk, then their index entries, so the index
+        never points at data that is not in the log yet. Entries for lines the
+        index already covers are skipped.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._file is None or not self._pending_index:
+                return
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            indexed = self._index_count()
+            last_offset = self._index_entry(indexed - 1)[0] if indexed else -1
+            self._index_file.write(b"".join(
+                INDEX_ENTRY.pack(*entry) for entry in self._pending_index if entry[0] > last_offset
+            ))
+            self._index_file.flush()
+            self._pending_index = []
+
+    def close(self):
+        """
+        Flushes pending orders and closes the log.
+        """
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._index_file.close()
+                self._file = self._index_file = None
+                atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _sync(self):
+        """
+        Flushes pending writes, or, if the log is not open for writing, indexes the
+        lines past the end of the index in memory; the index file is left to the writer.
+        """
+        with self._lock:
+            if self._file is not None:
+                self.flush()
+                self._indexed, self._unindexed = self._index_count(), []
+                return
+            log_size = os.path.getsize(self.file_path) if os.path.exists(self.file_path) else 0
+            count = self._index_count()
+            while count and self._index_entry(count - 1)[0] >= log_size:
+                count -= 1  # Torn or stale entries past the end of the log
+            if count != self._indexed or (self._unindexed and self._unindexed[-1][0] >= log_size):
+                self._indexed, self._unindexed = count, []
+            if not log_size:
+                return
+            if self._unindexed:
+                after = self._unindexed[-1]
+            else:
+                after = self._index_entry(count - 1) if count else None
+            self._unindexed.extend(self._index_lines(after)[0])
+
+    def count(self):
+        """
+        Returns the number of orders in the log.
+        """
+        self._sync()
+        return self._indexed + len(self._unindexed)
+
+    def _scan(self, offset):
+        """Yields (start_offset, end_offset, order) for every complete, valid line from offset on."""
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # Partially written line; pick it up on the next call
+                start, offset = offset, offset + len(line)
+                try:
+                    order = json.loads(line)
+                except ValueError as e:
+                    print(f"Skipping corrupt order at offset {start}: {e}")
+                    continue
+                yield start, offset, order
+
+    def tail(self, offset=0):
+        """
+        Streams orders starting at a byte offset, skipping corrupt lines.
+        :param offset: Byte offset to start from (0, or a next_offset previously returned).
+        :return: Generator of (next_offset, order); next_offset resumes after that order.
+        """
+        self._sync()
+        for _, next_offset, order in self._scan(offset):
+            yield next_offset, order
+
+    def iter_orders(self, start=0):
+        """
+        Streams past orders without loading the whole log.
+        :param start: Index of the first order to return.
+        :return: Generator of orders.
+        """
+        count = self.count()
+        if start >= count:
+            return
+        offset = self._entry(start)[0] if start else 0
+        for _, _, order in self._scan(offset):
+            yield order
+
+    def read_order(self, k):
+        """
+        Reads order number k (0-based) with a single seek.
+        :param k: Order index.
+        :return: The order, or None if it does not exist or is corrupt.
+        """
+        if k >= self.count():
+            return None
+        offset = self._entry(k)[0]
+        for start, _, order in self._scan(offset):
+            return order if start == offset else None
+        return None
+
+    def _entries(self, first, last):
+        """Yields the (offset, timestamp) entries of orders first to last - 1, reading the index in blocks."""
+        end = min(last, self._indexed)
+        if first < end:
+            with open(self.index_path, "rb") as index:
+                index.seek(first * INDEX_ENTRY.size)
+                while first < end:
+                    block = min(end - first, 4096)
+                    yield from INDEX_ENTRY.iter_unpack(index.read(block * INDEX_ENTRY.size))
+                    first += block
+        yield from self._unindexed[max(first - self._indexed, 0):max(last - self._indexed, 0)]
+
+    def _first_at_or_after(self, timestamp, count):
+        """
+        Binary-searches the index for the first order saved at or after timestamp.
+        Untimed entries before the first timed order sort first; a probe landing on
+        an untimed entry after it moves right to the next timed one, which is close
+        since only lines lost in a crash are untimed there.
+        """
+        low, high = 0, count
+        while low < high:
+            mid = probe = (low + high) // 2
+            ts = self._entry(probe)[1]
+            while math.isnan(ts) and probe + 1 < high:
+                probe += 1
+                ts = self._entry(probe)[1]
+            if math.isnan(ts) or ts >= timestamp:
+                high = mid
+            else:
+                low = probe + 1
+        return low
+
+    def orders_between(self, start_time, end_time):
+        """
+        Streams the orders saved in [start_time, end_time).
+        Index timestamps only grow as orders are appended, so both ends are found
+        by binary search and only the orders in the range are read. Orders indexed
+        without a save time (see UNTIMED_BEFORE) are never returned.
+        :param start_time: Start of the range (Unix time).
+        :param end_time: End of the range (Unix time).
+        :return: Generator of orders.
+        """
+        count = self.count()
+        first = self._first_at_or_after(start_time, count)
+        last = self._first_at_or_after(end_time, count)
+        if first >= last:
+            return
+        entries = self._entries(first, last)
+        offset, ts = next(entries)
+        for start, _, order in self._scan(offset):
+            while offset < start:  # Skipped a corrupt line
+                entry = next(entries, None)
+                if entry is None:
+                    return
+                offset, ts = entry
+            if math.isfinite(ts):
+                yield order
+            entry = next(entries, None)
+            if entry is None:
+                return
+            offset, ts = entry
+
     def load_orders(self):
         """Load all past orders from the file."""
         orders = []
         try:
-            if os.path.exists(self.file_path):
-                with open(self.file_path, 'r') as file:
-                    for line in file:
-                        order = json.loads(line.strip())
-                        orders.append(order)
+            orders.extend(self.iter_orders())
         except Exception as e:
             print(f"Error loading orders: {e}")
         return orders
@@ -1,21 +1,105 @@
+import sys
+import time
+from itertools import chain
+
 import cv2
-import mediapipe as mp
+import numpy as np
+
+from core.capture import open_capture
+from core.inference import AdaptiveHandInference, LazyHands, mediapipe_solutions
+
+NUM_LANDMARKS = 21
+TIP_IDS = np.array([4, 8, 12, 16, 20])  # Thumb, Index, Middle, Ring, Pinky
+INDEX_FINGER_MCP = 5
+PINKY_MCP = 17
+
+
+def landmarks_to_array(multi_hand_landmarks):
+    """
+    Converts Mediapipe hand landmarks into a single array.
+    :param multi_hand_landmarks: results.multi_hand_landmarks (may be None).
+    :return: Float32 array of shape (n_hands, 21, 3) with normalized (x, y, z).
+    """
+    if not multi_hand_landmarks:
+        return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    landmarks = np.empty((len(multi_hand_landmarks), NUM_LANDMARKS, 3), dtype=np.float32)
+    for i, hand_landmarks in enumerate(multi_hand_landmarks):
+        landmarks[i] = np.fromiter(
+            chain.from_iterable((lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark),
+            dtype=np.float32,
+            count=NUM_LANDMARKS * 3,
+        ).reshape(NUM_LANDMARKS, 3)
+    return landmarks
+
+
+def bounding_boxes(landmarks):
+    """
+    Computes the bounding box of every hand.
+    :param landmarks: Array of shape (n_hands, 21, >=2) in pixel coordinates.
+    :return: Int array of shape (n_hands, 4) with [x_min, y_min, x_max, y_max] per hand.
+    """
+    points = landmarks[..., :2].astype(np.int32)
+    return np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+
+
+def fingers_up_array(landmarks):
+    """
+    Determines which fingers are up for every hand at once.
+    :param landmarks: Array of shape (n_hands, 21, >=2), pixel or normalized coordinates.
+    :return: Uint8 array of shape (n_hands, 5) (1 for finger up, 0 for finger down).
+    """
+    tips = landmarks[:, TIP_IDS, :2]
+    fingers = np.empty((landmarks.shape[0], 5), dtype=np.uint8)
+    # The thumb is out when its tip lies beyond the joint below it on the far side from the palm,
+    # i.e. the side of the index knuckle relative to the pinky knuckle. Unlike a fixed x comparison,
+    # this holds for either hand, in mirrored and unmirrored frames alike.
+    outward = landmarks[:, INDEX_FINGER_MCP, 0] - landmarks[:, PINKY_MCP, 0]
+    fingers[:, 0] = (tips[:, 0, 0] - landmarks[:, TIP_IDS[0] - 1, 0]) * outward > 0
+    # Other fingers are up when the tip is above the joint two below it.
+    fingers[:, 1:] = tips[:, 1:, 1] < landmarks[:, TIP_IDS[1:] - 2, 1]
+    return fingers
+
 
 class HandTracker:
-    def __init__(self, detection_confidence=0.7, max_hands=2):
+    def __init__(self, detection_confidence=0.7, max_hands=2, adaptive=False, recorder=None):
         """
         Initializes the HandTracker with Mediapipe Hands module.
         :param detection_confidence: Minimum confidence value for hand detection.
         :param max_hands: Maximum number of hands to detect.
+        :param adaptive: Run inference on a downscaled frame / cropped hand region (see AdaptiveHandInference).
+        :param recorder: Optional core.recording.LandmarkRecorder receiving the landmarks of every frame.
         """
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        # The model is built on first use (or warm_up()), keeping construction cheap
+        self.hands = LazyHands(
             max_num_hands=max_hands,
             min_detection_confidence=detection_confidence,
             min_tracking_confidence=0.7
         )
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.tip_ids = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
+        self.inference = AdaptiveHandInference(self.hands) if adaptive else None
+        self.tip_ids = TIP_IDS.tolist()
+        self.results = None
+        self.landmarks = landmarks_to_array(None)  # Normalized (n_hands, 21, 3)
+        self.handedness = []
+        self._rgb = None  # RGB conversion buffer reused across frames
+        self.recorder = recorder
+
+    @property
+    def mp_hands(self):
+        return mediapipe_solutions().hands
+
+    @property
+    def mp_drawing(self):
+        return mediapipe_solutions().drawing_utils
+
+    def warm_up(self, shape=(480, 640, 3)):
+        """
+        Builds the model ahead of the first frame.
+        :param shape: Shape of the dummy frame used to prime the graph.
+        :return: Seconds spent.
+        """
+        if self.inference is not None:
+            return self.inference.warm_up(shape)
+        return self.hands.warm_up(shape)
 
     def find_hands(self, image, draw=True):
         """
@@ -24,8 +108,17 @@ class HandTracker:
         :param draw: Boolean flag to draw landmarks on the image.
         :return: Processed image with or without landmarks.
         """
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(rgb_image)
+        if self.inference is not None:
+            self.results = self.inference.process(image)
+        else:
+            self._rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, self._rgb)
+            self.results = self.hands.process(self._rgb)
+        self.landmarks = landmarks_to_array(self.results.multi_hand_landmarks)
+        self.handedness = [
+            handedness.classification[0].label for handedness in (self.results.multi_handedness or [])
+        ]
+        if self.recorder is not None:
+            self.recorder.record(time.perf_counter(), self.landmarks, self.handedness, image.shape)
 
         if self.results.multi_hand_landmarks and draw:
             for hand_landmarks in self.results.multi_hand_landmarks:
@@ -35,30 +128,29 @@ class HandTracker:
 
         return image
 
-    def find_positions(self, image):
+    def find_landmarks(self, image):
+        """
+        Returns the landmarks of every detected hand in pixel coordinates.
+        :param image: Image the landmarks were detected on (used for its size).
+        :return: Float32 array of shape (n_hands, 21, 3) with (x, y, z); z is scaled by the image width.
+        """
+        h, w = image.shape[:2]
+        return self.landmarks * np.array([w, h, w], dtype=np.float32)
+
+    def find_positions(self, image, hand_no=0):
         """
         Finds the positions of hand landmarks.
         :param image: Input image to process.
+        :param hand_no: Index of the hand to report when several are detected.
         :return: List of landmark positions [(id, x, y)] and bounding box [x_min, y_min, x_max, y_max].
         """
-        lm_list = []
-        bbox = []
-
-        if self.results.multi_hand_landmarks:
-            for hand_landmarks in self.results.multi_hand_landmarks:
-                h, w, _ = image.shape
-                x_min, y_min = w, h
-                x_max, y_max = 0, 0
-
-                for id, lm in enumerate(hand_landmarks.landmark):
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    lm_list.append((id, cx, cy))
-
-                    x_min, y_min = min(x_min, cx), min(y_min, cy)
-                    x_max, y_max = max(x_max, cx), max(y_max, cy)
-
-                bbox = [x_min, y_min, x_max, y_max]
+        if hand_no >= len(self.landmarks):
+            return [], []
 
+        landmarks = self.find_landmarks(image)[hand_no:hand_no + 1]
+        points = landmarks[0, :, :2].astype(np.int32).tolist()
+        lm_list = [(id, cx, cy) for id, (cx, cy) in enumerate(points)]
+        bbox = bounding_boxes(landmarks)[0].tolist()
         return lm_list, bbox
 
     def fingers_up(self, lm_list):
@@ -69,21 +161,11 @@ class HandTracker:
         """
         if not lm_list:
             return []
-
-        fingers = []
-
-        # Thumb
-        fingers.append(1 if lm_list[self.tip_ids[0]][1] > lm_list[self.tip_ids[0] - 1][1] else 0)
-
-        # Other fingers
-        for i in range(1, 5):
-            fingers.append(1 if lm_list[self.tip_ids[i]][2] < lm_list[self.tip_ids[i] - 2][2] else 0)
-
-        return fingers
+        return fingers_up_array(np.asarray(lm_list)[None, :, 1:3])[0].tolist()
 
 # Test the HandTracker class
 if __name__ == "__main__":
-    cap = cv2.VideoCapture(0)
+    cap = open_capture(sys.argv[1] if len(sys.argv) > 1 else 0)
     tracker = HandTracker()
 
     while True:
@@ -92,11 +174,11 @@ if __name__ == "__main__":
             break
 
         frame = tracker.find_hands(frame)
-        lm_list, bbox = tracker.find_positions(frame)
+        landmarks = tracker.find_landmarks(frame)
 
-        if lm_list:
-            fingers = tracker.fingers_up(lm_list)
-            print(f"Fingers up: {fingers}")
+        if len(landmarks):
+            for label, fingers in zip(tracker.handedness, fingers_up_array(landmarks).tolist()):
+                print(f"Fingers up ({label}): {fingers}")
 
         cv2.imshow("Hand Tracker", frame)
 
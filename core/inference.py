@@ -0,0 +1,196 @@
+import importlib
+import threading
+import time
+
+import cv2
+import numpy as np
+
+_solutions = None
+_solutions_lock = threading.Lock()
+
+
+def mediapipe_solutions():
+    """
+    Imports Mediapipe on first use, so importing the app modules stays cheap.
+    :return: The mediapipe.solutions module.
+    """
+    global _solutions
+    with _solutions_lock:
+        if _solutions is None:
+            _solutions = importlib.import_module("mediapipe").solutions
+        return _solutions
+
+
+class LazyHands:
+    def __init__(self, **options):
+        """
+        Drop-in stand-in for mediapipe.solutions.hands.Hands that builds the model
+        graph on first use (or on warm_up) instead of at construction time.
+        :param options: Keyword arguments passed to Hands().
+        """
+        self.options = options
+        self._hands = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._hands is not None
+
+    def get(self):
+        """
+        Returns the underlying Hands instance, creating it if needed.
+        :return: A mediapipe.solutions.hands.Hands instance.
+        """
+        with self._lock:
+            if self._hands is None:
+                self._hands = mediapipe_solutions().hands.Hands(**self.options)
+            return self._hands
+
+    def process(self, rgb_image):
+        return self.get().process(rgb_image)
+
+    def warm_up(self, shape=(480, 640, 3)):
+        """
+        Builds the model and primes the graph with a blank frame so the first real
+        frame does not pay for initialization.
+        :param shape: Shape of the dummy RGB frame (ideally the camera resolution).
+        :return: Seconds spent.
+        """
+        start = time.perf_counter()
+        self.get().process(np.zeros(shape, dtype=np.uint8))
+        return time.perf_counter() - start
+
+    def close(self):
+        with self._lock:
+            if self._hands is not None:
+                self._hands.close()
+                self._hands = None
+
+
+def mirror_landmarks(results):
+    """
+    Mirrors Mediapipe results horizontally in place, as if the frame had been flipped.
+    Landmark x becomes 1 - x and handedness labels are swapped.
+    :param results: Mediapipe Hands results.
+    """
+    for hand_landmarks in results.multi_hand_landmarks or []:
+        for lm in hand_landmarks.landmark:
+            lm.x = 1.0 - lm.x
+    for handedness in results.multi_handedness or []:
+        for classification in handedness.classification:
+            classification.label = "Left" if classification.label == "Right" else "Right"
+
+
+class AdaptiveHandInference:
+    def __init__(self, hands, detect_width=640, roi_width=320, roi_margin=0.6, min_roi_fraction=0.25,
+                 crop_hands=None):
+        """
+        Runs Mediapipe Hands on a downscaled frame while searching for a hand and on
+        an expanded crop around the last known hand while tracking it. Landmarks
+        are mapped back to full-frame normalized coordinates, so callers see the
+        same results as a full-resolution run.
+        Crops move and change scale from frame to frame, so they go through their own
+        static-image instance: a tracking instance carries its hand region over in the
+        input's coordinates and would follow the wrong spot. The detection instance
+        only ever sees whole frames.
+        :param hands: A mediapipe.solutions.hands.Hands (or LazyHands) instance for whole frames.
+        :param detect_width: Width frames are downscaled to for full-frame detection (None keeps full size).
+        :param roi_width: Width the tracking crop is downscaled to (None keeps crop size).
+        :param roi_margin: Margin added around the last hand bbox, as a fraction of its longest side.
+        :param min_roi_fraction: Minimum crop side as a fraction of the shorter frame side.
+        :param crop_hands: Instance for the crops; defaults to a LazyHands with the options of hands
+                           (if it is a LazyHands) and static_image_mode=True.
+        """
+        self.hands = hands
+        if crop_hands is None:
+            crop_hands = LazyHands(**dict(getattr(hands, "options", {}), static_image_mode=True))
+        self.crop_hands = crop_hands
+        self.detect_width = detect_width
+        self.roi_width = roi_width
+        self.roi_margin = roi_margin
+        self.min_roi_fraction = min_roi_fraction
+        self.roi = None  # (x0, y0, x1, y1) in pixels, None while searching
+        self.mode = "detect"
+        self._scratch = {}  # "detect"/"track" -> (resized, rgb) arrays reused across frames
+
+    def _run(self, hands, image, max_width, stage):
+        """Downscales the image if needed and runs inference on it, reusing the stage's scratch arrays."""
+        resized, rgb = self._scratch.get(stage, (None, None))
+        h, w = image.shape[:2]
+        if max_width and w > max_width:
+            image = resized = cv2.resize(image, (max_width, max(1, h * max_width // w)), resized,
+                                         interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, rgb)
+        self._scratch[stage] = (resized, rgb)
+        return hands.process(rgb)
+
+    @staticmethod
+    def _remap(results, x0, y0, crop_w, crop_h, w, h):
+        """Maps crop-normalized landmarks back to full-frame normalized coordinates in place."""
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = (x0 + lm.x * crop_w) / w
+                lm.y = (y0 + lm.y * crop_h) / h
+                lm.z = lm.z * crop_w / w
+
+    def _update_roi(self, results, w, h):
+        """Sets the next tracking crop to a square around every detected hand."""
+        if not results.multi_hand_landmarks:
+            self.roi = None
+            return
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        x_min, x_max = min(xs) * w, max(xs) * w
+        y_min, y_max = min(ys) * h, max(ys) * h
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_margin)
+        side = min(max(side, self.min_roi_fraction * min(w, h)), min(w, h))
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        self.roi = (x0, y0, x0 + int(side), y0 + int(side))
+
+    def process(self, frame):
+        """
+        Runs hand inference on a BGR frame.
+        :param frame: Full-resolution BGR frame.
+        :return: Mediapipe results with landmarks in full-frame normalized coordinates.
+        """
+        h, w = frame.shape[:2]
+        results = None
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            results = self._run(self.crop_hands, frame[y0:y1, x0:x1], self.roi_width, "track")
+            if results.multi_hand_landmarks:
+                self.mode = "track"
+                self._remap(results, x0, y0, x1 - x0, y1 - y0, w, h)
+            else:
+                results = None  # Hand lost; fall back to the full frame right away
+
+        if results is None:
+            self.mode = "detect"
+            results = self._run(self.hands, frame, self.detect_width, "detect")
+
+        self._update_roi(results, w, h)
+        return results
+
+    def warm_up(self, shape=(480, 640, 3)):
+        """
+        Builds and primes both instances, at the sizes they will see.
+        :param shape: Shape of the camera frames.
+        :return: Seconds spent.
+        """
+        h, w = shape[:2]
+        detect_w = min(w, self.detect_width or w)
+        crop_side = self.roi_width or min(h, w)
+        return (self.hands.warm_up((max(1, h * detect_w // w), detect_w, 3))
+                + self.crop_hands.warm_up((crop_side, crop_side, 3)))
+
+    def reset(self):
+        """
+        Forgets the tracking crop so the next frame is searched in full.
+        """
+        self.roi = None
+        self.mode = "detect"
+
+    def close(self):
+        self.crop_hands.close()
@@ -1,31 +1,26 @@
 import cv2
 import numpy as np
-import mediapipe as mp
 import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.capture import open_capture, read_frame
+from core.gesture import fingers_up_array
+from core.inference import LazyHands, mediapipe_solutions
+from core.pacing import FramePacer
+from ui.display import OverlayCache, WindowDisplay
+from ui.frame_ring import SharedFrameDisplay
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# Mediapipe setup
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
-
-def fingers_up(lm_list, tip_ids):
-    """Check which fingers are up."""
-    fingers = []
-    if lm_list[tip_ids[0]][1] < lm_list[tip_ids[0] - 1][1]:
-        fingers.append(1)
-    else:
-        fingers.append(0)
-
-    for i in range(1, 5):
-        if lm_list[tip_ids[i]][2] < lm_list[tip_ids[i] - 2][2]:
-            fingers.append(1)
-        else:
-            fingers.append(0)
+# Mediapipe setup; the model graph is built on first use, not at import
+hands = LazyHands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
 
-    return fingers
+def fingers_up(lm_list, tip_ids=None):
+    """Check which fingers are up (same test as HandTracker.fingers_up; tip_ids is kept for compatibility)."""
+    return fingers_up_array(np.asarray(lm_list)[None, :, 1:3])[0].tolist()
 
 def find_position(img, results, hand_no=0):
     """Find hand position and landmarks."""
@@ -38,8 +33,10 @@ def find_position(img, results, hand_no=0):
             lm_list.append([id, cx, cy])
     return lm_list
 
-def draw_menu(img):
-    """Draw a virtual menu on the screen."""
+menu_overlay = OverlayCache()
+
+def draw_menu_layer(img):
+    """Rasterize the virtual menu buttons and labels."""
     menu_height = 100
     colors = [(0, 255, 0), (0, 255, 255), (255, 0, 0), (0, 0, 255)]
     labels = ["Start Order", "View Order", "Cancel Order", "Exit"]
@@ -48,29 +45,54 @@ def draw_menu(img):
         x2, y2 = x1 + 150, menu_height
         cv2.rectangle(img, (x1, y1), (x2, y2), color, -1)
         cv2.putText(img, label, (x1 + 10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-    return [(i * 150, (i + 1) * 150) for i in range(len(colors))]
 
-def main():
+def draw_menu(img, masked=True):
+    """Draw a virtual menu on the screen."""
+    menu_overlay.composite(img, "menu", 0, draw_menu_layer, masked)
+    return [(i * 150, (i + 1) * 150) for i in range(4)]
+
+def main(source=0, display=None, pacer=None):
+    """
+    Runs the demo loop.
+    :param source: Frame source accepted by open_capture.
+    :param display: Frame sink with show(frame) -> key, wait(seconds) -> key and close(); an OpenCV window by default,
+                    or a SharedFrameDisplay to run headless.
+    :param pacer: FramePacer setting the frame rate and render quality (30 FPS by default).
+    """
     logging.info("Starting Touchless Tray Application")
-
-    cap = cv2.VideoCapture(0)
-    tip_ids = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
-
+    display = display if display is not None else WindowDisplay("Touchless Tray")
+    pacer = pacer if pacer is not None else FramePacer()
+
+    started = time.perf_counter()
+    # Build and prime the model while the camera opens
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending_cap = pool.submit(open_capture, source)
+        warm_up_time = hands.warm_up()
+        cap = pending_cap.result()
+    solutions = mediapipe_solutions()
+    logging.info("Model ready in %.0f ms, camera ready in %.0f ms",
+                 warm_up_time * 1000, (time.perf_counter() - started) * 1000)
+
+    raw = frame = frame_rgb = None  # Reused by every read, flip and color conversion
     while cap.isOpened():
-        ret, frame = cap.read()
+        ret, raw = read_frame(cap, raw)
         if not ret:
             logging.error("Failed to capture frame")
             break
+        if not pacer.admit():
+            continue
 
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        pacer.start_frame()
+        frame = cv2.flip(raw, 1, frame)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, frame_rgb)
         results = hands.process(frame_rgb)
 
-        menu_positions = draw_menu(frame)  # Draw menu on the frame
+        menu_positions = draw_menu(frame, pacer.overlay_masked)  # Draw menu on the frame
 
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            if pacer.draw_landmarks:
+                for hand_landmarks in results.multi_hand_landmarks:
+                    solutions.drawing_utils.draw_landmarks(frame, hand_landmarks, solutions.hands.HAND_CONNECTIONS)
 
             lm_list = find_position(frame, results)
 
@@ -91,17 +113,18 @@ def main():
                         elif i == 3:
                             logging.info("Exiting Application")
                             cap.release()
-                            cv2.destroyAllWindows()
+                            display.close()
                             return
 
-        cv2.imshow("Touchless Tray", frame)
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        key = display.show(frame)
+        if ord('q') in (key, display.wait(pacer.finish_frame())):
             break
 
     cap.release()
-    cv2.destroyAllWindows()
+    display.close()
     logging.info("Application Closed")
 
 if __name__ == "__main__":
-    main()
+    # python -m core.main [source] [--headless]
+    args = [arg for arg in sys.argv[1:] if arg != "--headless"]
+    main(args[0] if args else 0, SharedFrameDisplay() if "--headless" in sys.argv else None)
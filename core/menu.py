@@ -1,16 +1,206 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+
+import cv2
+
+DEFAULT_CATALOG = {
+    "categories": [
+        {"name": "Sandwiches", "items": [
+            {"id": "veg-sandwich", "name": "Veg Sandwich"},
+            {"id": "chicken-sandwich", "name": "Chicken Sandwich"},
+            {"id": "club-sandwich", "name": "Club Sandwich"},
+        ]},
+        {"name": "Drinks", "items": [
+            {"id": "coke", "name": "Coke"},
+            {"id": "pepsi", "name": "Pepsi"},
+            {"id": "lemonade", "name": "Lemonade"},
+            {"id": "water", "name": "Water"},
+        ]},
+        {"name": "Desserts", "items": [
+            {"id": "brownie", "name": "Brownie"},
+            {"id": "ice-cream", "name": "Ice Cream"},
+            {"id": "cake-slice", "name": "Cake Slice"},
+        ]},
+    ]
+}
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def slot_rect(index, rows=3):
+    """
+    Returns the button rectangle of the index-th slot of an item screen.
+    Slots fill a column of rows buttons before starting the next column.
+    :param index: Slot index.
+    :param rows: Buttons per column.
+    :return: (x1, y1, x2, y2).
+    """
+    col, row = divmod(index, rows)
+    x1, y1 = 100 + col * 350, 50 + row * 150
+    return (x1, y1, x1 + 300, y1 + 100)
+
+
+class MenuItem:
+    def __init__(self, item_id, name, category, price, position):
+        """
+        A catalog entry with its label, text metrics and screen slot resolved at load time.
+        :param item_id: Unique item id.
+        :param name: Display and order name.
+        :param category: Category name.
+        :param price: Unit price.
+        :param position: Index of the item within its category.
+        """
+        self.id = item_id
+        self.name = name
+        self.category = category
+        self.price = price
+        self.position = position
+        self.label = f"{name} ${price:g}" if price else name
+        self.rect = slot_rect(position)
+        self.text_scale, self.text_size, self.text_origin = self._fit_label()
+
+    def _fit_label(self, max_scale=1.0, thickness=2, padding=20):
+        """Measures the label once, shrinking it to fit its button, and centers it."""
+        x1, y1, x2, y2 = self.rect
+        (width, height), _ = cv2.getTextSize(self.label, FONT, max_scale, thickness)
+        scale = min(max_scale, (x2 - x1 - padding) / width) if width else max_scale
+        if scale < max_scale:
+            (width, height), _ = cv2.getTextSize(self.label, FONT, scale, thickness)
+        origin = (x1 + (x2 - x1 - width) // 2, y1 + (y2 - y1 + height) // 2)
+        return scale, (width, height), origin
+
+
 class Menu:
-    def __init__(self):
+    def __init__(self, source=None, table="menu_items", reload_interval=1.0):
         """
-        Initializes the menu with predefined categories and items.
+        Initializes the menu from a catalog source.
+        :param source: JSON file, SQLite database (.db/.sqlite/.sqlite3) or None for the built-in catalog.
+        :param table: Table holding (id, name, category, price) rows when the source is SQLite.
+        :param reload_interval: Minimum seconds between source change checks in reload_if_changed().
         """
-        self.categories = ["Sandwiches", "Drinks", "Desserts"]
-        self.items = {
-            "Sandwiches": ["Veg Sandwich", "Chicken Sandwich", "Club Sandwich"],
-            "Drinks": ["Coke", "Pepsi", "Lemonade", "Water"],
-            "Desserts": ["Brownie", "Ice Cream", "Cake Slice"]
-        }
+        if not TABLE_NAME.match(table):
+            raise ValueError(f"Invalid menu table name '{table}'.")
+        self.source = source
+        self.table = table
+        self.reload_interval = reload_interval
+        self.version = 0  # Incremented on every (re)load
+        self.is_sqlite = source is not None and source.endswith(SQLITE_EXTENSIONS)
+        self._conn = None  # Read-only connection kept open for PRAGMA data_version
+        self._rows = None
+        self._source_version = None
+        self._checked_at = 0.0
         self.current_category = None
         self.current_items = []
+        self.load()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(f"file:{self.source}?mode=ro", uri=True)
+        return self._conn
+
+    def _read_version(self):
+        """
+        Returns a value that changes when the source does: the file mtime, or for
+        SQLite the connection's data_version, which also sees commits still in the WAL.
+        """
+        if self.is_sqlite:
+            return self._connection().execute("PRAGMA data_version").fetchone()[0]
+        return os.path.getmtime(self.source)
+
+    def _read_source(self):
+        """Reads the raw catalog as a list of (id, name, category, price) rows."""
+        if self.source is None:
+            catalog = DEFAULT_CATALOG
+        elif self.is_sqlite:
+            return self._connection().execute(
+                f'SELECT id, name, category, COALESCE(price, 0) FROM "{self.table}" ORDER BY rowid'
+            ).fetchall()
+        else:
+            with open(self.source) as file:
+                catalog = json.load(file)
+        return [
+            (item.get("id", item["name"]), item["name"], category["name"], item.get("price", 0))
+            for category in catalog["categories"]
+            for item in category["items"]
+        ]
+
+    def load(self, rows=None):
+        """
+        (Re)loads the catalog and rebuilds the indexes and precomputed labels.
+        :param rows: Catalog rows already read from the source, if any.
+        """
+        source_version = self._read_version() if self.source else None
+        rows = rows if rows is not None else self._read_source()
+        categories = []
+        by_category = {}
+        by_id = {}
+        for item_id, name, category, price in rows:
+            if category not in by_category:
+                categories.append(category)
+                by_category[category] = []
+            item = MenuItem(item_id, name, category, price, len(by_category[category]))
+            by_category[category].append(item)
+            by_id[item_id] = item
+
+        self.categories = categories
+        self.items_by_category = by_category
+        self.items_by_id = by_id
+        self.items = {category: [item.name for item in items] for category, items in by_category.items()}
+        self.prices = {item.name: item.price for item in by_id.values()}
+        self._rows = rows
+        self._source_version = source_version
+        self.version += 1
+
+        if self.current_category not in by_category:
+            self.current_category = None
+            self.current_items = []
+        else:
+            self.current_items = self.items[self.current_category]
+
+    def reload_if_changed(self):
+        """
+        Reloads the catalog if its source changed, checking at most once per reload_interval.
+        A SQLite database may hold other tables (e.g. the orders), so a change there
+        only causes the menu rows to be compared, not a reload.
+        :return: True if the catalog was reloaded.
+        """
+        if self.source is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return False
+        self._checked_at = now
+        try:
+            source_version = self._read_version()
+        except (OSError, sqlite3.Error):
+            return False
+        if source_version == self._source_version:
+            return False
+        try:
+            rows = self._read_source() if self.is_sqlite else None
+            if rows is not None and rows == self._rows:
+                self._source_version = source_version
+                return False
+            self.load(rows)
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            logging.error("Error reloading menu: %s", e)
+            self._source_version = source_version  # Keep serving the last good catalog until the source changes again
+            return False
+        return True
+
+    def close(self):
+        """
+        Closes the SQLite connection, if any.
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def display_categories(self):
         """
@@ -25,13 +215,22 @@ class Menu:
         :param category: The category to be selected.
         :return: List of items under the selected category.
         """
-        if category in self.categories:
+        if category in self.items_by_category:
             self.current_category = category
             self.current_items = self.items[category]
             return self.current_items
         else:
             raise ValueError(f"Category '{category}' does not exist.")
 
+    def category_items(self, category=None):
+        """
+        Returns the MenuItem objects of a category, with their precomputed layout.
+        :param category: Category name (defaults to the current, then the first category).
+        :return: List of MenuItem.
+        """
+        category = category or self.current_category or (self.categories[0] if self.categories else None)
+        return self.items_by_category.get(category, [])
+
     def display_items(self):
         """
         Returns the items of the currently selected category.
@@ -1,50 +1,168 @@
+from itertools import islice
+
+
 class Order:
-    def __init__(self):
+    def __init__(self, catalog=None):
         """
         Initializes an empty order.
+        Quantities are kept per item in a dict, so adding, removing and
+        decrementing are O(1), and the total is maintained as items change, in
+        integer cents so it does not drift with float prices.
+        :param catalog: Optional mapping of item -> unit price used when no price is given.
         """
-        self.order_items = []
+        self.catalog = dict(catalog or {})
+        self.quantities = {}  # item -> quantity, in the order items were first added
+        self.prices = {}  # item -> unit price
         self.total_items = 0
+        self.total_cents = 0
+        self.version = 0  # Incremented on every change, for cheap change detection
+
+    @property
+    def total(self):
+        """Order total in currency units."""
+        return self.total_cents / 100
 
-    def add_item(self, item):
+    def _changed(self, item, delta):
+        self.total_items += delta
+        self.total_cents += delta * round(self.prices[item] * 100)
+        self.version += 1
+
+    def add_item(self, item, quantity=1, price=None):
         """
         Adds an item to the order.
         :param item: The item to add.
+        :param quantity: How many to add (at least 1).
+        :param price: Unit price; defaults to the price already in the order, then the catalog, then 0.
         """
-        self.order_items.append(item)
-        self.total_items += 1
-        print(f"Added: {item}")
+        if quantity < 1:
+            raise ValueError(f"Quantity must be at least 1, got {quantity}.")
+        if item not in self.quantities:
+            self.quantities[item] = 0
+            self.prices[item] = price if price is not None else self.catalog.get(item, 0)
+        self.quantities[item] += quantity
+        self._changed(item, quantity)
+
+    def decrement(self, item, quantity=1):
+        """
+        Lowers the quantity of an item, dropping it when it reaches zero.
+        :param item: The item to decrement.
+        :param quantity: How many to remove (at least 1).
+        :return: True if the item was in the order.
+        """
+        if quantity < 1:
+            raise ValueError(f"Quantity must be at least 1, got {quantity}.")
+        current = self.quantities.get(item)
+        if current is None:
+            return False
+        quantity = min(quantity, current)
+        self._changed(item, -quantity)
+        if current == quantity:
+            del self.quantities[item]
+            del self.prices[item]
+        else:
+            self.quantities[item] = current - quantity
+        return True
 
     def remove_item(self, item):
         """
         Removes an item from the order if it exists.
         :param item: The item to remove.
         """
-        if item in self.order_items:
-            self.order_items.remove(item)
-            self.total_items -= 1
-            print(f"Removed: {item}")
-        else:
+        if not self.decrement(item):
             print(f"Item '{item}' not in order!")
 
+    def delete_item(self, item):
+        """
+        Removes every unit of an item.
+        :param item: The item to delete.
+        :return: True if the item was in the order.
+        """
+        return self.decrement(item, self.quantities.get(item, 0)) if item in self.quantities else False
+
+    def item_at(self, index):
+        """
+        Returns the item at a display position without copying the order.
+        :param index: Position in the order (0-based).
+        :return: The item name, or None if out of range.
+        """
+        if not 0 <= index < len(self.quantities):
+            return None
+        return next(islice(self.quantities, index, None))
+
+    def clear(self):
+        """
+        Empties the order.
+        """
+        self.quantities.clear()
+        self.prices.clear()
+        self.total_items = 0
+        self.total_cents = 0
+        self.version += 1
+
+    def __len__(self):
+        return len(self.quantities)
+
+    def __contains__(self, item):
+        return item in self.quantities
+
+    def items(self):
+        """
+        Iterates over the order lines.
+        :return: Iterator of (item, quantity, unit_price).
+        """
+        return ((item, quantity, self.prices[item]) for item, quantity in self.quantities.items())
+
+    @property
+    def order_items(self):
+        """
+        List of ordered items with one entry per unit.
+        """
+        return [item for item, quantity in self.quantities.items() for _ in range(quantity)]
+
+    def to_dict(self):
+        """
+        Serializes the order for StorageManager and DatabaseManager.
+        :return: Dict of item -> {"quantity": ..., "price": ...}.
+        """
+        return {item: {"quantity": quantity, "price": price} for item, quantity, price in self.items()}
+
+    def to_records(self):
+        """
+        Serializes the order as (item, quantity, unit_price) line items.
+        """
+        return list(self.items())
+
+    @classmethod
+    def from_dict(cls, data, catalog=None):
+        """
+        Rebuilds an order serialized with to_dict().
+        :param data: Dict of item -> {"quantity": ..., "price": ...}.
+        :param catalog: Optional catalog for the new order.
+        :return: A new Order.
+        """
+        order = cls(catalog)
+        for item, details in data.items():
+            order.add_item(item, details["quantity"], details.get("price"))
+        return order
+
     def display_order(self):
         """
         Displays the current order summary.
         :return: List of items in the order.
         """
-        if not self.order_items:
+        if not self.quantities:
             print("Your order is empty.")
             return []
         print("\nCurrent Order:")
-        for i, item in enumerate(self.order_items, 1):
-            print(f"{i}. {item}")
+        for i, (item, quantity, price) in enumerate(self.items(), 1):
+            print(f"{i}. {item} x{quantity}")
         return self.order_items
 
     def finalize_order(self):
         """
         Finalizes the order and displays the summary.
         """
-        if not self.order_items:
+        if not self.quantities:
             print("Cannot finalize an empty order.")
             return "Order not finalized."
         print("\nOrder Finalized!")
@@ -0,0 +1,150 @@
+import logging
+import os
+import time
+
+import cv2
+
+# Render quality levels, shed from the top down when frames take longer than their budget
+QUALITY_FULL = 3
+QUALITY_NO_LANDMARKS = 2  # Skip draw_landmarks; only the fingertip is marked
+QUALITY_LOW_OVERLAY = 1  # Also copy the screen overlay as opaque panels instead of per pixel
+QUALITY_DROP_FRAMES = 0  # Also process only every other input frame, doubling the time per frame
+MAX_RESTORE_BACKOFF = 8  # Cap on how many times longer a restore may wait after failed attempts
+QUALITY_NAMES = {
+    QUALITY_FULL: "full",
+    QUALITY_NO_LANDMARKS: "no landmarks",
+    QUALITY_LOW_OVERLAY: "opaque overlay",
+    QUALITY_DROP_FRAMES: "drop frames",
+}
+
+
+def apply_thread_budget(threads=None, cpus=None):
+    """
+    Limits the CPU one tray instance uses, so several instances can share a box.
+    Mediapipe's graph sizes its own thread pools and reads no thread settings, so
+    pinning the process to a set of CPUs is the only limit that also covers inference.
+    :param threads: OpenCV worker threads (cv2.setNumThreads); None leaves OpenCV's default.
+    :param cpus: Optional set of CPUs to pin the process to (ignored where unsupported).
+    """
+    if threads:
+        cv2.setNumThreads(threads)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+class FramePacer:
+    def __init__(self, target_fps=30.0, shed_after=10, restore_after=90, restore_ratio=0.7, smoothing=0.1):
+        """
+        Paces a frame loop to a target rate with deadline-based waits, and sheds
+        render quality while frames take longer than their budget.
+        Deadlines advance by exactly one budget per processed frame, so the rate does
+        not drift; a loop that falls behind starts the next frame at once instead of
+        trying to catch up. The budget is the frame period, or twice it while every
+        other input frame is dropped. Quality is lowered one level after shed_after
+        frames over budget and raised again after restore_after frames comfortably
+        under it. A level that is shed again right after being restored waits twice
+        as long before the next attempt, so a borderline load does not oscillate.
+        :param target_fps: Frames per second, or None/0 to run unpaced (no waits, no shedding).
+        :param shed_after: Consecutive frames over budget before dropping a quality level.
+        :param restore_after: Consecutive frames under restore_ratio of the budget before raising it.
+        :param restore_ratio: Fraction of the budget the frame time must stay under to restore quality.
+        :param smoothing: Weight of the newest frame in the frame-time moving average.
+        """
+        self.period = 1.0 / target_fps if target_fps else 0.0
+        self.shed_after = shed_after
+        self.restore_after = restore_after
+        self.restore_ratio = restore_ratio
+        self.smoothing = smoothing
+        self.quality = QUALITY_FULL
+        self.frame_time = 0.0  # Moving average of the work per frame, in seconds
+        self.dropped = 0
+        self._started = None
+        self._deadline = None
+        self._over = 0
+        self._under = 0
+        self._admitted = 0
+        self._restore_wait = restore_after  # Frames under budget before the next restore
+        self._since_restore = None  # Frames processed since the last restore
+
+    @property
+    def budget(self):
+        """Seconds available per processed frame at the current quality."""
+        return self.period * (2 if self.quality == QUALITY_DROP_FRAMES else 1)
+
+    @property
+    def draw_landmarks(self):
+        """Whether the full hand skeleton should be drawn."""
+        return self.quality > QUALITY_NO_LANDMARKS
+
+    @property
+    def overlay_masked(self):
+        """Whether the screen overlay is copied per pixel rather than as opaque panels."""
+        return self.quality > QUALITY_LOW_OVERLAY
+
+    def admit(self):
+        """
+        Decides whether to process the next input frame.
+        :return: False for the frames dropped at the lowest quality level.
+        """
+        if self.quality > QUALITY_DROP_FRAMES:
+            return True
+        self._admitted += 1
+        if self._admitted % 2:
+            self.dropped += 1
+            return False
+        return True
+
+    def start_frame(self):
+        """
+        Marks the start of a frame's work (after the frame was read).
+        """
+        self._started = time.perf_counter()
+
+    def finish_frame(self):
+        """
+        Records the frame's work and schedules the next frame.
+        :return: Seconds to wait before starting the next frame (0 when late or unpaced).
+        """
+        now = time.perf_counter()
+        if self._started is not None:
+            self._observe(now - self._started)
+        if not self.period:
+            return 0.0
+        self._deadline = (self._started if self._deadline is None else self._deadline) + self.budget
+        if self._deadline < now:
+            self._deadline = now
+        return self._deadline - now
+
+    def _observe(self, work):
+        """Updates the frame-time average and sheds or restores quality."""
+        self.frame_time = work if not self.frame_time else self.frame_time + self.smoothing * (work - self.frame_time)
+        if not self.period:
+            return
+        if self._since_restore is not None:
+            self._since_restore += 1
+            if self._since_restore > self.restore_after:
+                self._since_restore, self._restore_wait = None, self.restore_after  # The restored level held
+        budget = self.budget
+        if self.frame_time > budget:
+            self._over, self._under = self._over + 1, 0
+            if self._over >= self.shed_after and self.quality > QUALITY_DROP_FRAMES:
+                if self._since_restore is not None:
+                    # Restored too early; back off before trying again
+                    self._restore_wait = min(self._restore_wait * 2, self.restore_after * MAX_RESTORE_BACKOFF)
+                self._since_restore = None
+                self._set_quality(self.quality - 1)
+        elif self.frame_time < budget * self.restore_ratio:
+            self._over, self._under = 0, self._under + 1
+            if self._under >= self._restore_wait and self.quality < QUALITY_FULL:
+                self._set_quality(self.quality + 1)
+                self._since_restore = 0
+        else:
+            self._over = self._under = 0
+
+    def _set_quality(self, quality):
+        logging.info("Frame time %.1f ms for a %.1f ms budget: render quality %s -> %s",
+                     self.frame_time * 1000, self.budget * 1000,
+                     QUALITY_NAMES[self.quality], QUALITY_NAMES[quality])
+        self.quality = quality
+        self.frame_time = 0.0  # Measure the new level from scratch
+        self._over = self._under = 0
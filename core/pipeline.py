@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import deque
+
+from core.capture import FrameBufferPool, read_frame
+from ui.display import WindowDisplay
+
+
+class LatestValueQueue:
+    def __init__(self, maxsize=1, on_drop=None):
+        """
+        Bounded queue that keeps only the newest values.
+        When the queue is full, putting a new value silently evicts the oldest one,
+        so a slow consumer always sees fresh data instead of a growing backlog.
+        :param maxsize: Maximum number of values held at once.
+        :param on_drop: Optional callable receiving each evicted value (e.g. to recycle its buffer).
+        """
+        self._items = deque(maxlen=maxsize)
+        self.on_drop = on_drop
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, value):
+        """
+        Stores a value, evicting the oldest one if the queue is full.
+        :param value: The value to store.
+        """
+        evicted = None
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                evicted = self._items[0]
+            self._items.append(value)
+            self._cond.notify()
+        if evicted is not None and self.on_drop is not None:
+            self.on_drop(evicted)
+
+    def get(self, timeout=None):
+        """
+        Waits for the next value.
+        :param timeout: Maximum time to wait in seconds (None waits forever).
+        :return: The oldest held value, or None if the queue was closed or the wait timed out.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """
+        Closes the queue and wakes up every waiting consumer.
+        """
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FramePipeline:
+    def __init__(self, app, cap, window_name="Touchless Tray", display=None, stop_event=None):
+        """
+        Runs capture, hand inference and rendering as three overlapping stages.
+        Capture and inference each run on their own thread; rendering stays on the
+        calling thread because most GUI backends require imshow/waitKey there.
+        :param app: TouchlessTray instance providing analyze(), locate_hand() and step().
+        :param cap: Opened cv2.VideoCapture (or any object with read()).
+        :param window_name: Name of the display window.
+        :param display: Frame sink with show(frame) -> key and wait(seconds) -> key (defaults to a WindowDisplay).
+        :param stop_event: Optional Event that ends the run after the frame being rendered.
+        """
+        self.app = app
+        self.cap = cap
+        self.window_name = window_name
+        self.display = display if display is not None else WindowDisplay(window_name)
+        # Frame arrays are recycled: capture fills a pooled buffer, which goes back to the
+        # pool once rendered or when a newer frame evicts it from a queue
+        self.buffers = FrameBufferPool()
+        self.frames = LatestValueQueue(on_drop=lambda item: self.buffers.release(item[1]))
+        self.results = LatestValueQueue(on_drop=lambda item: self.buffers.release(item[1]))
+        self._stop = threading.Event()
+        self.stop_event = stop_event
+        self.frames_captured = 0
+        self.frames_rendered = 0
+        self.last_latency = 0.0
+
+    def _capture_loop(self):
+        """Reads frames continuously, keeping only the newest one for inference."""
+        timer = self.app.metrics.timer
+        raw = None
+        try:
+            while not self._stop.is_set():
+                buffer = self.buffers.acquire()
+                with timer("capture"):
+                    # Without a flip the frame is read straight into the pooled buffer
+                    ret, raw = read_frame(self.cap, buffer if self.app.mirror_landmarks else raw)
+                if not ret:
+                    break
+                with timer("flip"):
+                    frame = self.app.mirror(raw, buffer)
+                self.frames_captured += 1
+                self.frames.put((time.perf_counter(), frame))
+        finally:
+            self.frames.close()
+
+    def _inference_loop(self):
+        """Runs hand inference on the newest captured frame."""
+        try:
+            while not self._stop.is_set():
+                item = self.frames.get()
+                if item is None:
+                    break
+                captured_at, frame = item
+                results = self.app.analyze(frame, captured_at)
+                self.results.put((captured_at, frame, results))
+        finally:
+            self.results.close()
+
+    def stop(self):
+        """
+        Signals every stage to finish and unblocks waiting consumers.
+        """
+        self._stop.set()
+        self.frames.close()
+        self.results.close()
+
+    def run(self):
+        """
+        Starts the capture and inference threads and renders on the calling thread
+        until the source is exhausted, the user exits, or the exit key is pressed.
+        """
+        threads = [
+            threading.Thread(target=self._capture_loop, name="tray-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="tray-inference", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        metrics = self.app.metrics
+        pacer = self.app.pacer
+        try:
+            while True:
+                item = self.results.get()
+                if item is None:
+                    break
+                captured_at, frame, results = item
+                pacer.start_frame()
+                hand_pos = self.app.locate_hand(frame, results, captured_at)
+                with metrics.timer("render"):
+                    keep_running = self.app.step(frame, hand_pos, captured_at)
+                if not keep_running:
+                    break
+
+                with metrics.timer("display"):
+                    key = self.display.show(frame)
+                with metrics.timer("pace_wait"):
+                    # Keep handling window events until the next frame's deadline
+                    waited = self.display.wait(pacer.finish_frame())
+                self.buffers.release(frame)
+                self.frames_rendered += 1
+                self.last_latency = time.perf_counter() - captured_at
+                metrics.observe("frame_latency", self.last_latency)
+                metrics.set_gauge("dropped_frames", self.frames.dropped)
+                if 27 in (key, waited) or (self.stop_event is not None and self.stop_event.is_set()):
+                    break
+        finally:
+            self.stop()
+            for thread in threads:
+                thread.join(timeout=1.0)
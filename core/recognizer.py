@@ -0,0 +1,186 @@
+from collections import namedtuple
+
+import numpy as np
+
+from core.gesture import NUM_LANDMARKS, fingers_up_array
+
+# kind is one of "swipe_left", "swipe_right", "pinch" or "fist"; x, y is the palm center (normalized).
+Gesture = namedtuple("Gesture", ["kind", "hand", "x", "y", "timestamp"])
+
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+PALM_IDS = np.array([0, 5, 9, 13, 17])  # Wrist and the four knuckles
+FINGER_BITS = np.array([1, 2, 4, 8, 16], dtype=np.uint8)  # Thumb, Index, Middle, Ring, Pinky
+OPEN_FINGERS = 0b11100  # Middle, ring and pinky
+FIST_FINGERS = 0b11110  # Every finger but the thumb, whose test is unreliable in a fist
+
+
+class GestureRecognizer:
+    def __init__(self, max_hands=2, history=8, swipe_distance=0.25, swipe_window=0.5, pinch_on=0.35,
+                 pinch_off=0.5, hold_frames=3, fist_hold=0.6, cooldown=0.6, match_distance=0.2):
+        """
+        Recognizes multi-frame hand gestures from landmark arrays.
+        Each hand keeps a fixed-size ring buffer of its landmarks. Every update
+        writes one slot and computes the features of all hands at once (palm
+        velocity over the buffer, pinch distance, finger bitmask), comparing
+        against the oldest buffered sample only, so the cost per frame does
+        not depend on the history length.
+        Mediapipe does not keep hands in the same order from frame to frame, so
+        each hand is matched to the buffer whose last palm center is nearest.
+        :param max_hands: Hands tracked at once.
+        :param history: Frames kept per hand; a swipe is measured across them.
+        :param swipe_distance: Horizontal palm travel for a swipe, as a fraction of the frame width.
+        :param swipe_window: Maximum seconds the swipe travel may take.
+        :param pinch_on: Thumb-index tip distance, relative to palm length, below which the hand pinches.
+        :param pinch_off: Distance above which a pinch is released (hysteresis).
+        :param hold_frames: Consecutive frames a pinch must be held before it is reported.
+        :param fist_hold: Seconds a fist must be held before it is reported; it cancels the order,
+                          so a passing closed hand must not trigger it.
+        :param cooldown: Seconds after a swipe during which the same hand cannot swipe again.
+        :param match_distance: Maximum palm movement between frames, as a fraction of the frame
+                               width, for a hand to be considered the same hand.
+        """
+        self.max_hands = max_hands
+        self.size = history
+        self.swipe_distance = swipe_distance
+        self.swipe_window = swipe_window
+        self.pinch_on = pinch_on
+        self.pinch_off = pinch_off
+        self.hold_frames = hold_frames
+        self.fist_hold = fist_hold
+        self.cooldown = cooldown
+        self.match_distance = match_distance
+
+        self.history = np.zeros((max_hands, history, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.times = np.zeros((max_hands, history))
+        self.head = 0  # Slot written by the latest update, shared by every hand
+        self.filled = np.zeros(max_hands, dtype=np.int64)  # Consecutive samples buffered per hand
+        self.palm = np.zeros((max_hands, 2))  # Last palm center per hand, for matching
+
+        # Latest features per hand
+        self.velocity = np.zeros((max_hands, 2))
+        self.pinch_distance = np.zeros(max_hands)
+        self.finger_mask = np.zeros(max_hands, dtype=np.uint8)
+
+        self._pinch_frames = np.zeros(max_hands, dtype=np.int64)
+        self._fist_since = np.full(max_hands, np.nan)  # Time the current fist started, NaN without one
+        self._pinching = np.zeros(max_hands, dtype=bool)
+        self._fist = np.zeros(max_hands, dtype=bool)
+        self._swipe_after = np.zeros(max_hands)
+
+    def _forget(self, hands):
+        """Clears the history and held gestures of some hands (index array or boolean mask)."""
+        self.filled[hands] = 0
+        self._pinch_frames[hands] = 0
+        self._fist_since[hands] = np.nan
+        self._pinching[hands] = False
+        self._fist[hands] = False
+
+    def reset(self):
+        """
+        Forgets every hand's history and held gestures.
+        """
+        self._forget(slice(None))
+
+    def _match(self, centers):
+        """
+        Assigns each detected hand to a tracked hand, nearest palms first.
+        Hands without a match within match_distance start over in a free slot,
+        and tracked hands left without a detected hand are forgotten.
+        :param centers: Palm centers of the detected hands, shape (n, 2).
+        :return: Index array of the slot of every detected hand.
+        """
+        n = len(centers)
+        slots = np.full(n, -1)
+        taken = np.zeros(self.max_hands, dtype=bool)
+        distance = np.linalg.norm(centers[:, None, :] - self.palm[None, :, :], axis=2)
+        distance[:, self.filled == 0] = np.inf
+        for flat in np.argsort(distance, axis=None):
+            hand, slot = divmod(int(flat), self.max_hands)
+            if distance[hand, slot] > self.match_distance:
+                break
+            if slots[hand] < 0 and not taken[slot]:
+                slots[hand] = slot
+                taken[slot] = True
+
+        self._forget(~taken)  # Hands that disappeared start over when they come back
+        free = iter(np.flatnonzero(~taken))
+        for hand in np.flatnonzero(slots < 0):
+            slots[hand] = next(free)
+        return slots
+
+    def update(self, landmarks, timestamp):
+        """
+        Adds one frame of landmarks and classifies gestures.
+        :param landmarks: Array of shape (n_hands, 21, >=2) in normalized coordinates (see landmarks_to_array).
+        :param timestamp: Frame time in seconds.
+        :return: List of Gesture, usually empty; Gesture.hand identifies the hand across frames.
+        """
+        n = min(len(landmarks), self.max_hands)
+        if n == 0:
+            self._forget(slice(None))
+            return []
+
+        current = landmarks[:n, :, :3]
+        center = current[:, PALM_IDS, :2].mean(axis=1)
+        slots = self._match(center)
+
+        self.head = (self.head + 1) % self.size
+        self.history[slots, self.head, :, :current.shape[2]] = current
+        self.times[slots, self.head] = timestamp
+        self.filled[slots] = np.minimum(self.filled[slots] + 1, self.size)
+        self.palm[slots] = center
+        oldest = (self.head - self.filled[slots] + 1) % self.size
+
+        # Palm travel across the buffered frames
+        travel = center - self.history[slots, oldest][:, PALM_IDS, :2].mean(axis=1)
+        elapsed = timestamp - self.times[slots, oldest]
+        self.velocity[slots] = np.divide(travel, elapsed[:, None], out=np.zeros_like(travel),
+                                         where=elapsed[:, None] > 0)
+
+        # Thumb-index tip distance relative to the palm length, so it does not depend on the hand's distance
+        palm = np.linalg.norm(current[:, MIDDLE_FINGER_MCP, :2] - current[:, WRIST, :2], axis=1)
+        pinch = np.linalg.norm(current[:, THUMB_TIP, :2] - current[:, INDEX_FINGER_TIP, :2], axis=1)
+        self.pinch_distance[slots] = pinch / np.maximum(palm, 1e-6)
+        self.finger_mask[slots] = fingers_up_array(current) @ FINGER_BITS
+
+        return self._classify(slots, center, travel, elapsed, timestamp)
+
+    def _classify(self, slots, center, travel, elapsed, timestamp):
+        """Turns the feature arrays into gestures, latching pinch and fist until released."""
+        mask = self.finger_mask[slots]
+        dx, dy = np.abs(travel[:, 0]), np.abs(travel[:, 1])
+        swipe = ((self.filled[slots] > 1) & (elapsed <= self.swipe_window) & (dx >= self.swipe_distance)
+                 & (dx >= 2 * dy) & (timestamp >= self._swipe_after[slots]))
+
+        fist_shape = (mask & FIST_FINGERS) == 0
+        since = self._fist_since[slots]
+        since = np.where(fist_shape, np.where(np.isnan(since), timestamp, since), np.nan)
+        self._fist_since[slots] = since
+        fist = fist_shape & (timestamp - np.nan_to_num(since, nan=timestamp) >= self.fist_hold) & ~self._fist[slots]
+        self._fist[slots] = fist_shape & (self._fist[slots] | fist)
+
+        # A pinch keeps the other fingers open, which also tells it apart from a fist
+        pinching = np.where(self._pinching[slots], self.pinch_distance[slots] < self.pinch_off,
+                            (self.pinch_distance[slots] < self.pinch_on) & ((mask & OPEN_FINGERS) != 0))
+        self._pinch_frames[slots] = np.where(pinching, self._pinch_frames[slots] + 1, 0)
+        pinch = (self._pinch_frames[slots] >= self.hold_frames) & ~self._pinching[slots]
+        self._pinching[slots] = pinching & (self._pinching[slots] | pinch)
+
+        gestures = []
+        for i in np.flatnonzero(swipe | pinch | fist):
+            hand = int(slots[i])
+            x, y = float(center[i, 0]), float(center[i, 1])
+            if swipe[i]:
+                kind = "swipe_right" if travel[i, 0] > 0 else "swipe_left"
+                gestures.append(Gesture(kind, hand, x, y, timestamp))
+                # Measure the next swipe from here
+                self.filled[hand] = 1
+                self._swipe_after[hand] = timestamp + self.cooldown
+            if fist[i]:
+                gestures.append(Gesture("fist", hand, x, y, timestamp))
+            if pinch[i]:
+                gestures.append(Gesture("pinch", hand, x, y, timestamp))
+        return gestures
@@ -0,0 +1,225 @@
+"""
+Landmark stream recording and replay.
+
+A recording is a 16-byte header followed by fixed-size records, one per frame:
+timestamp, hand count, handedness and normalized landmarks of up to max_hands
+hands. Fixed-size records make the file memory-mappable as a NumPy structured
+array, so hours of sessions can be replayed through the UI logic without video
+or MediaPipe.
+
+Usage:
+    python main1.py --record session.ttlm
+    python -m core.recording session.ttlm [--select] [--db replay.db]
+"""
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from core.gesture import NUM_LANDMARKS
+
+MAGIC = b"TTLM"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHBxII")  # magic, version, max_hands, pad, frame width, frame height
+HANDEDNESS_CODES = {"Left": 1, "Right": 2}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+INDEX_FINGER_TIP = 8
+
+
+def record_dtype(max_hands=2):
+    """
+    Returns the structured dtype of one frame record.
+    :param max_hands: Hands stored per frame.
+    """
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("n_hands", "u1"),
+        ("handedness", "u1", (max_hands,)),  # 0 unknown, 1 Left, 2 Right
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 3)),  # Normalized (x, y, z)
+    ])
+
+
+class LandmarkRecorder:
+    def __init__(self, path, max_hands=2, frame_size=None):
+        """
+        Appends one record per frame to a landmark recording.
+        The header is written with the first record, once the frame size is known.
+        :param path: Output file (overwritten).
+        :param max_hands: Hands stored per frame; extra hands are dropped.
+        :param frame_size: (width, height) of the frames, or None to take it from the first record.
+        """
+        self.path = path
+        self.max_hands = max_hands
+        self.frame_size = frame_size
+        self.frames = 0
+        self._record = np.zeros(1, dtype=record_dtype(max_hands))
+        self._file = None
+
+    def record(self, timestamp, landmarks, handedness=(), frame_shape=None):
+        """
+        Writes one frame.
+        :param timestamp: Frame time in seconds.
+        :param landmarks: Array of shape (n_hands, 21, 3) in normalized coordinates.
+        :param handedness: "Left"/"Right" label per hand.
+        :param frame_shape: Shape of the frame, used for the header if frame_size was not given.
+        """
+        if self._file is None:
+            if self.frame_size is None:
+                height, width = frame_shape[:2] if frame_shape is not None else (0, 0)
+                self.frame_size = (width, height)
+            self._file = open(self.path, "wb")
+            self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.max_hands, *self.frame_size))
+
+        n = min(len(landmarks), self.max_hands)
+        record = self._record[0]
+        record["timestamp"] = timestamp
+        record["n_hands"] = n
+        record["handedness"] = 0
+        record["landmarks"] = 0
+        record["landmarks"][:n] = landmarks[:n, :, :3]
+        for i, label in enumerate(list(handedness)[:n]):
+            record["handedness"][i] = HANDEDNESS_CODES.get(label, 0)
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class LandmarkRecording:
+    def __init__(self, path):
+        """
+        Opens a recording as a read-only memory map; nothing is loaded up front.
+        A torn last record (e.g. after a crash) is ignored.
+        :param path: Recording file.
+        """
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"'{path}' is not a landmark recording.")
+        magic, version, max_hands, width, height = HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' is not a version {FORMAT_VERSION} landmark recording.")
+        self.path = path
+        self.max_hands = max_hands
+        self.frame_size = (width, height)
+        dtype = record_dtype(max_hands)
+        count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        self.records = (np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+                        if count else np.zeros(0, dtype=dtype))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records["timestamp"]
+
+    @property
+    def duration(self):
+        """Seconds between the first and last frame."""
+        return float(self.timestamps[-1] - self.timestamps[0]) if len(self) else 0.0
+
+    def between(self, start_time, end_time):
+        """
+        Returns the records within a time range, as a view.
+        :param start_time: First timestamp to include.
+        :param end_time: Timestamps up to (excluding) this one are included.
+        """
+        start, end = np.searchsorted(self.timestamps, [start_time, end_time])
+        return self.records[start:end]
+
+    def __iter__(self):
+        """
+        Iterates over the frames.
+        :return: Iterator of (timestamp, landmarks, handedness); landmarks is a (n_hands, 21, 3) view.
+        """
+        for record in self.records:
+            n = record["n_hands"]
+            handedness = [HANDEDNESS_LABELS.get(code, "") for code in record["handedness"][:n]]
+            yield float(record["timestamp"]), record["landmarks"][:n], handedness
+
+
+def replay_recording(recording, app, select_directly=False):
+    """
+    Feeds a recording into a TouchlessTray's selection and order logic, without
+    video, rendering or MediaPipe, as fast as the logic runs.
+    :param recording: LandmarkRecording (or path to one).
+    :param app: TouchlessTray instance.
+    :param select_directly: Call handle_selection() on every frame (the original
+                            hover-to-select behaviour) instead of the dwell/gesture events.
+    :return: Dict with frames, seconds and whether the recording ended with an exit.
+    """
+    if not isinstance(recording, LandmarkRecording):
+        recording = LandmarkRecording(recording)
+    width, height = recording.frame_size
+    frames = 0
+    exited = False
+    start = time.perf_counter()
+    for timestamp, landmarks, handedness in recording:
+        frames += 1
+        hand_pos = None
+        if len(landmarks):
+            x, y = landmarks[0, INDEX_FINGER_TIP, :2]
+            hand_pos = int(x * width), int(y * height)
+        if select_directly:
+            keep_running = app.handle_selection(*hand_pos) if hand_pos else True
+        else:
+            app.observe_landmarks(landmarks, handedness, timestamp)
+            keep_running = app.handle_input(hand_pos, timestamp)
+        if not keep_running:
+            exited = True
+            break
+    return {"frames": frames, "seconds": time.perf_counter() - start, "exited": exited}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a landmark recording through the tray logic.")
+    parser.add_argument("recording", help="Recording written with main1.py --record.")
+    parser.add_argument("--select", action="store_true", help="Select on hover instead of dwell/gestures.")
+    parser.add_argument("--gestures", action="store_true", help="Recognize swipe, pinch and fist gestures.")
+    parser.add_argument("--menu", help="Menu catalog; defaults to data/menu.json.")
+    parser.add_argument("--db", help="Persist the replayed orders to this SQLite database.")
+    args = parser.parse_args()
+
+    from core.menu import Menu
+    from core.recognizer import GestureRecognizer
+    from main1 import TouchlessTray
+
+    orders = []
+    db = None
+    if args.db:
+        from storage.database import DatabaseManager
+        db = DatabaseManager(args.db)
+        db.create_order_table()
+
+    def sink(order):
+        orders.append(order)
+        if db is not None:
+            db.insert_order(order)
+
+    recording = LandmarkRecording(args.recording)
+    app = TouchlessTray(order_sink=sink, menu=Menu(args.menu) if args.menu else None,
+                        recognizer=GestureRecognizer() if args.gestures else None)
+    report = replay_recording(recording, app, args.select)
+    if db is not None:
+        db.close()
+    print(f"Replayed {report['frames']} frames ({recording.duration:.1f}s of session) in "
+          f"{report['seconds']:.3f}s; {len(orders)} orders confirmed, final screen {app.current_state}"
+          f"{' (exited)' if report['exited'] else ''}")
+    for order in orders:
+        print(order)
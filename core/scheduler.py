@@ -0,0 +1,112 @@
+import logging
+import time
+
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Values of the inference_mode gauge
+MODE_CODES = {"idle": 0, "search": 1, "track": 2}
+
+
+class InferenceScheduler:
+    def __init__(self, idle_after=5.0, idle_hz=3.0, track_every=1, extrapolate=True, max_extrapolation=0.25,
+                 metrics=None):
+        """
+        Decides on which frames hand inference runs.
+        Modes:
+          - "idle": no hand for idle_after seconds; inference runs at idle_hz.
+          - "search": a hand was seen recently; inference runs on every frame.
+          - "track": a hand is visible; inference runs every track_every-th frame and
+            landmarks for the frames in between are extrapolated from the last two results.
+        :param idle_after: Seconds without a hand before dropping to the idle rate.
+        :param idle_hz: Detection rate while idle.
+        :param track_every: Run inference on every k-th frame while tracking (1 runs every frame).
+        :param extrapolate: Linearly extrapolate landmarks on skipped frames (otherwise hold the last result).
+        :param max_extrapolation: Seconds after the last result beyond which landmarks are held instead of extrapolated.
+        :param metrics: Metrics registry receiving the inference_mode (see MODE_CODES) and
+                        inference_rate gauges; defaults to the process-wide METRICS.
+        """
+        self.idle_after = idle_after
+        self.idle_interval = 1.0 / idle_hz
+        self.track_every = max(1, int(track_every))
+        self.extrapolate = extrapolate
+        self.max_extrapolation = max_extrapolation
+        self.metrics = metrics or METRICS
+
+        self.mode = "search"
+        self.inference_rate = 0.0  # Smoothed inferences per second
+        self._last_seen = time.perf_counter()
+        self._last_inference = None
+        self._frames_since_inference = 0
+        self._previous = None  # (timestamp, landmarks) of the result before the latest one
+        self._latest = None  # (timestamp, landmarks) of the latest result with a hand
+
+    def _set_mode(self, mode):
+        if mode != self.mode:
+            logger.info("Inference scheduler: %s -> %s", self.mode, mode)
+            self.mode = mode
+
+    def should_infer(self, timestamp=None):
+        """
+        Tells whether inference should run on the current frame.
+        :param timestamp: Frame time in seconds (defaults to time.perf_counter()).
+        :return: True if the frame should go through the model.
+        """
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self._last_inference is None:
+            run = True
+        elif self.mode == "idle":
+            run = timestamp - self._last_inference >= self.idle_interval
+        elif self.mode == "track":
+            run = self._frames_since_inference + 1 >= self.track_every
+        else:
+            run = True
+
+        if not run:
+            self._frames_since_inference += 1
+        return run
+
+    def observe(self, landmarks, timestamp=None):
+        """
+        Records the outcome of an inference run.
+        :param landmarks: Normalized landmark array of shape (n_hands, 21, 3) (empty when no hand).
+        :param timestamp: Frame time in seconds (defaults to time.perf_counter()).
+        """
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self._last_inference is not None:
+            dt = timestamp - self._last_inference
+            if dt > 0:
+                self.inference_rate = 0.9 * self.inference_rate + 0.1 * (1.0 / dt)
+        self._last_inference = timestamp
+        self._frames_since_inference = 0
+
+        if len(landmarks):
+            self._last_seen = timestamp
+            self._previous = self._latest
+            self._latest = (timestamp, landmarks)
+            self._set_mode("track")
+        else:
+            self._previous = self._latest = None
+            self._set_mode("idle" if timestamp - self._last_seen >= self.idle_after else "search")
+        self.metrics.set_gauge("inference_mode", MODE_CODES[self.mode])
+        self.metrics.set_gauge("inference_rate", self.inference_rate)
+
+    def predict(self, timestamp=None):
+        """
+        Estimates landmarks for a frame that skipped inference.
+        :param timestamp: Frame time in seconds (defaults to time.perf_counter()).
+        :return: Normalized landmark array of shape (n_hands, 21, 3), or None when no hand is tracked.
+        """
+        if self._latest is None:
+            return None
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        latest_time, latest = self._latest
+        if (not self.extrapolate or self._previous is None
+                or timestamp - latest_time > self.max_extrapolation):
+            return latest
+        previous_time, previous = self._previous
+        if previous.shape != latest.shape or latest_time <= previous_time:
+            return latest
+        ratio = (timestamp - latest_time) / (latest_time - previous_time)
+        return latest + (latest - previous) * ratio
@@ -0,0 +1,180 @@
+"""
+Runs one TouchlessTray per camera or video source, each in its own process,
+with every confirmed order routed to a single database writer.
+
+Usage:
+    python -m core.supervisor 0 1 2 --db orders.db --threads-per-worker 2
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+
+def assign_cpus(n_workers, cpus=None):
+    """
+    Splits the available CPUs into one contiguous, non-overlapping set per worker.
+    :param n_workers: Number of workers.
+    :param cpus: CPUs to distribute (defaults to the CPUs this process may run on).
+    :return: List of CPU sets, one per worker (empty sets when pinning is unsupported).
+    """
+    if cpus is None:
+        if not hasattr(os, "sched_getaffinity"):
+            return [set() for _ in range(n_workers)]
+        cpus = sorted(os.sched_getaffinity(0))
+    per_worker = max(1, len(cpus) // n_workers)
+    return [
+        set(cpus[(i * per_worker) % len(cpus):(i * per_worker) % len(cpus) + per_worker])
+        for i in range(n_workers)
+    ]
+
+
+def run_tray_worker(tray_id, source, orders, cpus, threads, pipelined, stop_event=None):
+    """
+    Process entry point: runs one tray on one source.
+    The process is pinned to its CPUs before Mediapipe is loaded, so each worker,
+    inference included, stays within its own cores.
+    On stop_event the tray finishes its frame and the worker waits until its
+    orders have been handed to the queue's pipe before exiting.
+    :param tray_id: Identifier of this tray, used in its window title and logs.
+    :param source: Frame source spec accepted by open_capture.
+    :param orders: multiprocessing queue leading to the order writer.
+    :param cpus: Set of CPUs to pin this process to (empty to leave unpinned).
+    :param threads: OpenCV thread budget.
+    :param pipelined: Run the tray in pipelined mode.
+    :param stop_event: multiprocessing Event asking the tray to stop.
+    """
+    from core.pacing import apply_thread_budget
+
+    apply_thread_budget(threads, cpus=cpus)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The supervisor decides when workers stop
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    from main1 import TouchlessTray
+
+    logging.info("Tray %s: source=%s cpus=%s threads=%d", tray_id, source, sorted(cpus), threads)
+
+    app = TouchlessTray(
+        order_sink=lambda order: orders.put((tray_id, dict(order))),
+        window_name=f"Touchless Tray {tray_id}",
+    )
+    try:
+        app.run(pipelined=pipelined, source=source, stop_event=stop_event)
+    finally:
+        orders.close()
+        orders.join_thread()  # Flush the orders still buffered in the feeder thread
+        logging.info("Tray %s stopped", tray_id)
+
+
+def run_order_writer(orders, db_name):
+    """
+    Single writer owning the SQLite database; drains orders until it receives None.
+    Orders are batched through a write-behind queue, which also retries while the
+    database is locked. Orders are stored without their tray id, which is only logged.
+    :param orders: multiprocessing queue of (tray_id, order) tuples.
+    :param db_name: SQLite database path.
+    """
+    from storage.writer import database_writer
+
+    writer = database_writer(db_name, block_timeout=None)
+    while True:
+        entry = orders.get()
+        if entry is None:
+            break
+        tray_id, order = entry
+        if not writer.submit(order):
+            logging.error("Order from tray %s not persisted: %s", tray_id, writer.error)
+    writer.close()
+    logging.info("Order writer stopped: %s", writer.stats)
+
+
+class TraySupervisor:
+    def __init__(self, sources, db_name="orders.db", threads_per_worker=1, pipelined=False, stop_timeout=5.0):
+        """
+        Starts and supervises one tray process per source.
+        :param sources: Frame source specs, one per tray.
+        :param db_name: SQLite database receiving every tray's orders.
+        :param threads_per_worker: Thread budget per worker process.
+        :param pipelined: Run each tray in pipelined mode.
+        :param stop_timeout: Seconds stop() waits for the workers to exit cleanly before terminating them.
+        """
+        self.sources = list(sources)
+        self.db_name = db_name
+        self.threads_per_worker = threads_per_worker
+        self.pipelined = pipelined
+        # spawn gives every worker a clean interpreter without the parent's threads
+        self.context = multiprocessing.get_context("spawn")
+        self.orders = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.stop_timeout = stop_timeout
+        self.workers = []
+        self.writer = None
+        self._stopped = False
+
+    def start(self):
+        self.writer = threading.Thread(
+            target=run_order_writer, args=(self.orders, self.db_name), name="order-writer", daemon=True
+        )
+        self.writer.start()
+
+        for tray_id, (source, cpus) in enumerate(zip(self.sources, assign_cpus(len(self.sources)))):
+            worker = self.context.Process(
+                target=run_tray_worker,
+                args=(tray_id, source, self.orders, cpus, self.threads_per_worker, self.pipelined, self.stop_event),
+                name=f"tray-{tray_id}",
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    def wait(self):
+        for worker in self.workers:
+            worker.join()
+
+    def stop(self):
+        """
+        Asks every worker to stop, then lets the writer drain the queued orders before returning.
+        Workers still running after stop_timeout are terminated as a last resort; orders
+        they had not yet handed to the queue are lost.
+        """
+        if self._stopped:
+            return
+        self._stopped = True
+        self.stop_event.set()
+        deadline = time.monotonic() + self.stop_timeout
+        for worker in self.workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        for worker in self.workers:
+            if worker.is_alive():
+                logging.warning("Tray %s did not stop within %.0fs; terminating it", worker.name, self.stop_timeout)
+                worker.terminate()
+                worker.join()
+        self.orders.put(None)
+        if self.writer is not None:
+            self.writer.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+", help="Camera indexes, video files or synthetic specs, one per tray.")
+    parser.add_argument("--db", default="orders.db", help="SQLite database shared by all trays.")
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="OpenCV threads per tray.")
+    parser.add_argument("--pipelined", action="store_true", help="Run each tray in pipelined mode.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    supervisor = TraySupervisor(args.sources, args.db, args.threads_per_worker, args.pipelined)
+    signal.signal(signal.SIGTERM, lambda signum, frame: supervisor.stop())
+    supervisor.start()
+    try:
+        supervisor.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.stop()
+
+
+if __name__ == "__main__":
+    main()
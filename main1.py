@@ -1,35 +1,233 @@
+import argparse
 import cv2
-import mediapipe as mp
+import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.capture import open_capture, read_frame
+from core.events import GestureEventEngine
+from core.gesture import landmarks_to_array
+from core.inference import AdaptiveHandInference, LazyHands, mediapipe_solutions, mirror_landmarks
+from core.menu import Menu, slot_rect
+from core.order import Order
+from core.pacing import FramePacer, apply_thread_budget
+from core.pipeline import FramePipeline
+from core.recognizer import GestureRecognizer
+from core.recording import LandmarkRecorder
+from core.scheduler import InferenceScheduler
+from storage.writer import database_writer, log_writer
+from ui.display import OverlayCache, WindowDisplay
+from ui.frame_ring import SharedFrameDisplay
+from ui.navigation import Button, ScreenLayout
+from utils.metrics import METRICS
+
+INDEX_FINGER_TIP = 8  # mediapipe HandLandmark.INDEX_FINGER_TIP
+DEFAULT_MENU_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "menu.json")
+BUTTON_COLORS = [(0, 255, 0), (255, 0, 0), (0, 0, 255)]
+
+
+def persist_to(primary, secondary=None):
+    """
+    Builds the order sink for the write-behind queues.
+    An order counts as saved once the primary queue accepted it; the secondary
+    one is best-effort, so a customer retrying after a failure never duplicates
+    the order in the primary store.
+    :param primary: WriteBehindQueue holding the orders of record (the database if any).
+    :param secondary: Optional WriteBehindQueue keeping a copy (the JSON-lines log).
+    """
+    def sink(order):
+        if not primary.submit(order):
+            return False
+        if secondary is not None and not secondary.submit(order):
+            logging.warning("Order saved but not copied to the secondary log")
+        return True
+    return sink
+
+
+def build_item_buttons(menu):
+    """Builds the order screen from the catalog; labels and slots are precomputed by the menu."""
+    items = menu.category_items()
+    buttons = [
+        Button(item.label, item.rect, BUTTON_COLORS[i % 3], ("add", item.name, item.price),
+               item.text_origin, item.text_scale)
+        for i, item in enumerate(items)
+    ]
+    x1, y1, x2, y2 = slot_rect(len(items))
+    buttons.append(Button("Back", (x1, y1, x2, y2), BUTTON_COLORS[len(items) % 3], ("goto", "MainMenu"),
+                          (x1 + 100, y1 + 60)))
+    return buttons
+
+
+def build_screen_layouts(menu):
+    """Declares every screen's buttons once; used for both drawing and hit-testing."""
+    return {
+        "MainMenu": ScreenLayout([
+            Button("Start Order", (100, 50, 400, 150), (0, 255, 0), ("goto", "StartOrder"), (150, 110)),
+            Button("View Order", (100, 200, 400, 300), (255, 0, 0), ("goto", "ViewOrder"), (150, 260)),
+            Button("Checkout", (100, 350, 400, 450), (0, 0, 255), ("goto", "Checkout"), (150, 410)),
+            Button("Exit", (100, 500, 400, 600), (255, 255, 0), ("exit",), (200, 560)),
+        ]),
+        "StartOrder": ScreenLayout(build_item_buttons(menu)),
+        "ViewOrder": ScreenLayout([
+            Button("Back", (100, 500, 400, 600), (0, 0, 255), ("goto", "MainMenu"), (200, 560)),
+        ]),
+        "Checkout": ScreenLayout([
+            Button("Confirm", (100, 200, 400, 300), (0, 255, 0), ("confirm",), (200, 260)),
+            Button("Back", (100, 350, 400, 450), (255, 0, 0), ("goto", "MainMenu"), (200, 410)),
+            Button("Exit", (100, 500, 400, 600), (0, 0, 255), ("exit",), (200, 560)),
+        ]),
+    }
 
 
 class TouchlessTray:
-    def __init__(self):
-        # Initialize Mediapipe Hands
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands()
-        self.drawing_utils = mp.solutions.drawing_utils
+    def __init__(self, adaptive_inference=False, scheduler=None, order_sink=None, window_name="Touchless Tray",
+                 menu=None, metrics=None, mirror_landmarks=False, recognizer=None, recorder=None, pacer=None):
+        # Mediapipe Hands; the model is built on first use or by warm_up()
+        self.hands = LazyHands()
+        # Optional downscaled detection / cropped tracking around the last hand
+        self.inference = AdaptiveHandInference(self.hands) if adaptive_inference else None
+        # Optional InferenceScheduler that idles detection and skips frames while tracking
+        self.scheduler = scheduler
+        # Mirror the landmarks instead of flipping every frame (the camera image is then shown unmirrored)
+        self.mirror_landmarks = mirror_landmarks
+        self._rgb = None  # RGB conversion buffer reused across frames
 
         # State management
         self.current_state = "MainMenu"  # Can be MainMenu, StartOrder, ViewOrder, Checkout
-        self.order = {}  # Store ordered items with quantities and prices
+        # Catalog loaded from data/menu.json (or a given Menu), hot-reloaded when the file changes
+        if menu is None:
+            menu = Menu(DEFAULT_MENU_PATH if os.path.exists(DEFAULT_MENU_PATH) else None)
+        self.menu = menu
+        self.order = Order(menu.prices)  # Ordered items with quantities, prices and a running total
         self.feedback_message = ""  # Temporary feedback message
         self.feedback_timer = 0  # Timer for feedback message display
-
-    def detect_hand_position(self, frame):
+        self.order_sink = order_sink  # Optional callable receiving each confirmed order
+        self.window_name = window_name
+
+        # Screen buttons, shared by the renderers and handle_selection
+        self.layouts = build_screen_layouts(self.menu)
+
+        # Fingertip smoothing and dwell-to-select; actions run only on "select" events
+        self.gestures = GestureEventEngine(self.hit_test)
+        # Optional GestureRecognizer: swipe changes category, pinch selects or confirms, fist cancels
+        self.recognizer = recognizer
+        self.pending_gestures = []
+        # Optional LandmarkRecorder capturing the landmarks of every inferred frame for replay
+        self.recorder = recorder
+
+        # Static screen layers are rendered once per state/order version and composited per frame
+        self.overlays = OverlayCache()
+        self.renderers = {
+            "MainMenu": self.render_main_menu,
+            "StartOrder": self.render_start_order,
+            "ViewOrder": self.render_view_order,
+            "Checkout": self.render_checkout,
+        }
+
+        # Per-stage latency histograms (capture, flip, cvt_color, hands_process, landmarks, render, display)
+        self.metrics = metrics or METRICS
+        # Paces the frame loop and sheds render quality when frames run over budget
+        self.pacer = pacer if pacer is not None else FramePacer()
+
+        # Startup timings in seconds, filled in by run()
+        self.startup_report = {}
+        self._started_at = None
+
+    @property
+    def mp_hands(self):
+        return mediapipe_solutions().hands
+
+    @property
+    def drawing_utils(self):
+        return mediapipe_solutions().drawing_utils
+
+    def warm_up(self, shape=(480, 640, 3)):
+        """Builds the hand model and primes it with a dummy frame; returns seconds spent."""
+        if self.inference is not None:
+            return self.inference.warm_up(shape)
+        return self.hands.warm_up(shape)
+
+    def infer(self, frame):
+        """Runs hand inference on a BGR frame and returns the raw Mediapipe results."""
+        if self.inference is not None:
+            with self.metrics.timer("hands_process"):
+                return self.inference.process(frame)
+        with self.metrics.timer("cvt_color"):
+            self._rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, self._rgb)
+        with self.metrics.timer("hands_process"):
+            return self.hands.process(self._rgb)
+
+    def mirror(self, frame, dst=None):
+        """
+        Mirrors a captured frame so the screen behaves like a mirror.
+        :param frame: Captured BGR frame.
+        :param dst: Array to write the mirrored frame into, reused when its shape matches.
+        :return: The mirrored frame, or the frame itself when landmarks are mirrored instead.
+        """
+        if self.mirror_landmarks:
+            return frame
+        return cv2.flip(frame, 1, dst)
+
+    def analyze(self, frame, timestamp=None):
+        """Runs inference if the scheduler wants this frame; returns None for skipped frames."""
+        if self.scheduler is not None and not self.scheduler.should_infer(timestamp):
+            return None
+        results = self.infer(frame)
+        if self.mirror_landmarks:
+            mirror_landmarks(results)
+        if self.scheduler is None:
+            return results
+        self.scheduler.observe(landmarks_to_array(results.multi_hand_landmarks), timestamp)
+        return results
+
+    def detect_hand_position(self, frame, timestamp=None):
         """Detects hand position and landmarks."""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        return self.locate_hand(frame, self.analyze(frame, timestamp), timestamp)
+
+    def locate_hand(self, frame, results, timestamp=None):
+        """Draws the detected landmarks and returns the index fingertip position."""
+        with self.metrics.timer("landmarks"):
+            hand_pos = self._locate_hand(frame, results, timestamp)
+            if results is not None and (self.recognizer is not None or self.recorder is not None):
+                self.observe_landmarks(
+                    landmarks_to_array(results.multi_hand_landmarks),
+                    [handedness.classification[0].label for handedness in results.multi_handedness or []],
+                    time.perf_counter() if timestamp is None else timestamp,
+                    frame.shape,
+                )
+        return hand_pos
+
+    def observe_landmarks(self, landmarks, handedness, timestamp, frame_shape=None):
+        """Feeds one frame of normalized landmarks to the recorder and the gesture recognizer."""
+        if self.recorder is not None:
+            self.recorder.record(timestamp, landmarks, handedness, frame_shape)
+        if self.recognizer is not None:
+            self.pending_gestures.extend(self.recognizer.update(landmarks, timestamp))
+
+    def _locate_hand(self, frame, results, timestamp):
+        h, w, _ = frame.shape
+        if results is None:
+            # Skipped frame: use the scheduler's extrapolated landmarks
+            landmarks = self.scheduler.predict(timestamp) if self.scheduler is not None else None
+            if landmarks is None or not len(landmarks):
+                return None
+            index_finger_tip = landmarks[0, INDEX_FINGER_TIP]
+            x, y = int(index_finger_tip[0] * w), int(index_finger_tip[1] * h)
+            cv2.circle(frame, (x, y), 6, (0, 0, 255), -1)
+            return x, y
 
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
-                self.drawing_utils.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
                 # Get position of index fingertip
-                index_finger_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                h, w, _ = frame.shape
+                index_finger_tip = hand_landmarks.landmark[INDEX_FINGER_TIP]
                 x, y = int(index_finger_tip.x * w), int(index_finger_tip.y * h)
+                if self.pacer.draw_landmarks:
+                    self.drawing_utils.draw_landmarks(
+                        frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
+                    )
+                else:
+                    cv2.circle(frame, (x, y), 6, (0, 255, 0), -1)
                 return x, y
         return None
 
@@ -40,38 +238,21 @@ class TouchlessTray:
 
     def render_main_menu(self, frame):
         """Renders the main menu."""
-        cv2.rectangle(frame, (100, 50), (400, 150), (0, 255, 0), -1)
-        cv2.putText(frame, "Start Order", (150, 110), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-
-        cv2.rectangle(frame, (100, 200), (400, 300), (255, 0, 0), -1)
-        cv2.putText(frame, "View Order", (150, 260), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-
-        cv2.rectangle(frame, (100, 350), (400, 450), (0, 0, 255), -1)
-        cv2.putText(frame, "Checkout", (150, 410), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-
-        cv2.rectangle(frame, (100, 500), (400, 600), (255, 255, 0), -1)
-        cv2.putText(frame, "Exit", (200, 560), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        self.layouts["MainMenu"].draw(frame)
 
     def render_start_order(self, frame):
         """Renders the order menu."""
-        cv2.rectangle(frame, (100, 50), (400, 150), (0, 255, 0), -1)
-        cv2.putText(frame, "Burger $5", (150, 110), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-
-        cv2.rectangle(frame, (100, 200), (400, 300), (255, 0, 0), -1)
-        cv2.putText(frame, "Pizza $8", (150, 260), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-
-        cv2.rectangle(frame, (100, 350), (400, 450), (0, 0, 255), -1)
-        cv2.putText(frame, "Back", (200, 410), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        self.layouts["StartOrder"].draw(frame)
 
     def render_view_order(self, frame):
         """Renders the current order."""
         y = 50
         cv2.putText(frame, "Your Order:", (50, y), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
         y += 50
-        for idx, (item, details) in enumerate(self.order.items()):
+        for idx, (item, quantity, price) in enumerate(self.order.items()):
             cv2.putText(
                 frame,
-                f"{item}: {details['quantity']} x ${details['price']}  [Del: {idx+1}]",
+                f"{item}: {quantity} x ${price}  [Del: {idx+1}]",
                 (50, y),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.8,
@@ -80,117 +261,276 @@ class TouchlessTray:
             )
             y += 50
 
-        cv2.rectangle(frame, (100, 500), (400, 600), (0, 0, 255), -1)
-        cv2.putText(frame, "Back", (200, 560), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        self.layouts["ViewOrder"].draw(frame)
 
     def render_checkout(self, frame):
         """Renders the checkout menu."""
-        total_cost = sum(details['quantity'] * details['price'] for details in self.order.values())
-        cv2.putText(frame, f"Total: ${total_cost}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
-
-        cv2.rectangle(frame, (100, 200), (400, 300), (0, 255, 0), -1)
-        cv2.putText(frame, "Confirm", (200, 260), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        cv2.putText(frame, f"Total: ${self.order.total:.2f}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
 
-        cv2.rectangle(frame, (100, 350), (400, 450), (255, 0, 0), -1)
-        cv2.putText(frame, "Back", (200, 410), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-
-        cv2.rectangle(frame, (100, 500), (400, 600), (0, 0, 255), -1)
-        cv2.putText(frame, "Exit", (200, 560), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        self.layouts["Checkout"].draw(frame)
 
     def add_to_order(self, item, price):
         """Adds an item to the order."""
-        if item in self.order:
-            self.order[item]["quantity"] += 1
-        else:
-            self.order[item] = {"quantity": 1, "price": price}
+        self.order.add_item(item, price=price)
         self.feedback_message = f"Item Added: {item}"
         self.feedback_timer = time.time()
 
     def delete_from_order(self, idx):
         """Deletes an item from the order by index."""
-        if idx < len(self.order):
-            item = list(self.order.keys())[idx]
-            del self.order[item]
+        item = self.order.item_at(idx)
+        if item is not None:
+            self.order.delete_item(item)
             self.feedback_message = f"Item Removed: {item}"
             self.feedback_timer = time.time()
 
     # Rest of the implementation...
 
 
+    def hit_test(self, x, y):
+        """Returns the button of the current screen under a point, if any."""
+        layout = self.layouts.get(self.current_state)
+        return layout.hit_test(x, y) if layout else None
+
     def handle_selection(self, x, y):
         """Handles menu selections based on hand position."""
-        if self.current_state == "MainMenu":
-            if 50 < x < 250:
-                if 100 < y < 200:
-                    self.current_state = "StartOrder"
-                elif 250 < y < 350:
-                    self.current_state = "ViewOrder"
-                elif 400 < y < 500:
-                    self.current_state = "Checkout"
-                elif 550 < y < 650:
-                    return False  # Exit application
-
-        elif self.current_state == "StartOrder":
-            if 50 < x < 250:
-                if 100 < y < 200:
-                    self.add_to_order("Burger", 5)
-                elif 250 < y < 350:
-                    self.add_to_order("Pizza", 8)
-                elif 400 < y < 500:
-                    self.current_state = "MainMenu"
-
-        elif self.current_state == "ViewOrder":
-            if 500 < y < 600:
-                self.current_state = "MainMenu"
-
-        elif self.current_state == "Checkout":
-            if 400 < y < 500:
-                self.order = {}  # Clear the order
-                self.current_state = "MainMenu"
-            elif 550 < y < 650:
-                self.current_state = "MainMenu"
-
+        button = self.hit_test(x, y)
+        if button is None:
+            return True
+        return self.perform(button.action)
+
+    def perform(self, action):
+        """Applies a button action; returns False when the application should exit."""
+        kind = action[0]
+        if kind == "goto":
+            self.current_state = action[1]
+            self.gestures.disarm()  # The fingertip may now rest on a button of the new screen
+        elif kind == "add":
+            self.add_to_order(action[1], action[2])
+        elif kind == "confirm":
+            if self.order and self.order_sink is not None and self.order_sink(self.order.to_dict()) is False:
+                # Persistence queue is full; keep the order so the customer can retry
+                self.feedback_message = "Order not saved, please try again"
+                self.feedback_timer = time.time()
+                return True
+            self.order.clear()
+            self.current_state = "MainMenu"
+            self.gestures.disarm()
+        elif kind == "exit":
+            return False  # Exit application
         return True
 
-    def add_to_order(self, item, price):
-        """Adds an item to the order."""
-        if item in self.order:
-            self.order[item]["quantity"] += 1
-        else:
-            self.order[item] = {"quantity": 1, "price": price}
-
-    def run(self):
-        """Runs the main application loop."""
-        cap = cv2.VideoCapture(0)
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+    def perform_gesture(self, gesture):
+        """Applies a recognized gesture; returns False when the application should exit."""
+        if gesture.kind in ("swipe_left", "swipe_right"):
+            if self.current_state == "StartOrder":
+                self.cycle_category(1 if gesture.kind == "swipe_left" else -1)
+        elif gesture.kind == "pinch":
+            # Pinching clicks the hovered button right away; at checkout it otherwise confirms
+            target = self.gestures.target
+            if target is not None:
+                self.gestures.reset()
+                return self.perform(target.action)
+            if self.current_state == "Checkout":
+                return self.perform(("confirm",))
+        elif gesture.kind == "fist":
+            if self.order:
+                self.order.clear()
+                self.feedback_message = "Order Cancelled"
+                self.feedback_timer = time.time()
+            self.current_state = "MainMenu"
+            self.gestures.disarm()
+        return True
 
-            frame = cv2.flip(frame, 1)
-            hand_pos = self.detect_hand_position(frame)
+    def cycle_category(self, step):
+        """Shows the next (or previous) menu category on the order screen."""
+        categories = self.menu.categories
+        if not categories:
+            return
+        current = self.menu.current_category or categories[0]
+        category = categories[(categories.index(current) + step) % len(categories)]
+        self.menu.select_category(category)
+        self.layouts["StartOrder"] = ScreenLayout(build_item_buttons(self.menu))
+        self.gestures.reset()  # The hovered button was replaced
+        self.gestures.disarm()
+        self.feedback_message = f"Category: {category}"
+        self.feedback_timer = time.time()
 
-            if self.current_state == "MainMenu":
-                self.render_main_menu(frame)
+    def render(self, frame):
+        """Renders the screen for the current state from its cached overlay layer."""
+        renderer = self.renderers.get(self.current_state)
+        if renderer:
+            # Only the order and checkout screens show order contents, only the item screen shows the menu
+            if self.current_state in ("ViewOrder", "Checkout"):
+                version = self.order.version
             elif self.current_state == "StartOrder":
-                self.render_start_order(frame)
-            elif self.current_state == "ViewOrder":
-                self.render_view_order(frame)
-            elif self.current_state == "Checkout":
-                self.render_checkout(frame)
-
-            if hand_pos:
-                x, y = hand_pos
-                if not self.handle_selection(x, y):
-                    break
-
-            cv2.imshow("Touchless Tray", frame)
-            if cv2.waitKey(1) & 0xFF == 27:
+                version = (self.menu.version, self.menu.current_category)
+            else:
+                version = 0
+            self.overlays.composite(frame, self.current_state, version, renderer, self.pacer.overlay_masked)
+
+    def refresh_menu(self):
+        """Rebuilds the screens after the catalog changed."""
+        self.layouts = build_screen_layouts(self.menu)
+        self.order.catalog = dict(self.menu.prices)
+        self.gestures.reset()  # The hovered button may no longer exist
+
+    def render_dwell(self, frame, timestamp):
+        """Draws a progress bar along the hovered button while the dwell timer runs."""
+        target = self.gestures.target
+        if target is not None:
+            x1, y1, x2, y2 = target.rect
+            progress = self.gestures.dwell_progress(timestamp)
+            cv2.rectangle(frame, (x1, y2 - 8), (x1 + int((x2 - x1) * progress), y2), (255, 255, 255), -1)
+
+    def handle_input(self, hand_pos, timestamp):
+        """Acts on recognized gestures and fingertip dwell events; returns False to exit."""
+        gestures, self.pending_gestures = self.pending_gestures, []
+        for gesture in gestures:
+            if not self.perform_gesture(gesture):
+                return False
+
+        for event in self.gestures.update(hand_pos, timestamp):
+            if event.kind == "select" and not self.perform(event.target.action):
+                return False
+        return True
+
+    def step(self, frame, hand_pos, timestamp=None):
+        """Renders one frame and acts on gesture events; returns False to exit."""
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self.menu.reload_if_changed():
+            self.refresh_menu()
+        if self._started_at is not None and "first_frame" not in self.startup_report:
+            self.report_startup("first_frame", time.perf_counter() - self._started_at)
+        self.render(frame)
+        if not self.handle_input(hand_pos, timestamp):
+            return False
+        self.render_dwell(frame, timestamp)
+        self.display_feedback(frame)
+        return True
+
+    def run(self, pipelined=False, source=0, display=None, stop_event=None):
+        """
+        Runs the main application loop.
+        With pipelined=True, capture and inference run on their own threads and
+        only the newest frame is processed, keeping latency bounded under load.
+        The source is a camera index, a video file or a synthetic spec (see open_capture).
+        The display receives every annotated frame and reports key presses: an OpenCV
+        window by default, or a SharedFrameDisplay to run headless.
+        Setting stop_event (a threading or multiprocessing Event) ends the loop after the current frame.
+        """
+        display = display if display is not None else WindowDisplay(self.window_name)
+        self._started_at = time.perf_counter()
+        # Build and prime the model while the camera opens
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending_cap = pool.submit(self._open_capture, source)
+            self.report_startup("warm_up", self.warm_up())
+            cap = pending_cap.result()
+
+        try:
+            if pipelined:
+                FramePipeline(self, cap, self.window_name, display, stop_event).run()
+            else:
+                self._run_serial(cap, display, stop_event)
+        finally:
+            cap.release()
+            display.close()
+
+    def _open_capture(self, source):
+        start = time.perf_counter()
+        cap = open_capture(source)
+        self.report_startup("camera_open", time.perf_counter() - start)
+        return cap
+
+    def report_startup(self, stage, seconds):
+        """Records and logs one startup stage duration."""
+        self.startup_report[stage] = seconds
+        logging.info("Startup %s: %.0f ms", stage, seconds * 1000)
+
+    def _run_serial(self, cap, display, stop_event=None):
+        """Captures, infers and renders each frame in turn on the calling thread."""
+        timer = self.metrics.timer
+        raw = frame = None  # Read and mirror into the same two arrays every frame
+        pacer = self.pacer
+        while stop_event is None or not stop_event.is_set():
+            with timer("capture"):
+                ret, raw = read_frame(cap, raw)
+            if not ret:
+                break
+            if not pacer.admit():
+                continue  # Over budget at the lowest render quality: skip this input frame
+
+            pacer.start_frame()
+            timestamp = time.perf_counter()
+            with timer("flip"):
+                frame = self.mirror(raw, frame)
+            hand_pos = self.detect_hand_position(frame, timestamp)
+            with timer("render"):
+                keep_running = self.step(frame, hand_pos, timestamp)
+            if not keep_running:
                 break
 
-        cap.release()
-        cv2.destroyAllWindows()
+            with timer("display"):
+                key = display.show(frame)
+            with timer("pace_wait"):
+                # Keep handling window events until the next frame's deadline
+                waited = display.wait(pacer.finish_frame())
+            if 27 in (key, waited):
+                break
 
 # Run the application
-app = TouchlessTray()
-app.run()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Touchless ordering tray.")
+    parser.add_argument("source", nargs="?", default=0, help="Camera index, video file or synthetic spec.")
+    parser.add_argument("--pipelined", action="store_true", help="Overlap capture, inference and rendering.")
+    parser.add_argument("--adaptive", action="store_true", help="Downscaled detection and cropped tracking.")
+    parser.add_argument("--idle-scheduler", action="store_true", help="Slow down inference while no hand is seen.")
+    parser.add_argument("--menu", help="Menu catalog (JSON file or SQLite database); defaults to data/menu.json.")
+    parser.add_argument("--db", help="Persist confirmed orders to this SQLite database.")
+    parser.add_argument("--log", help="Persist confirmed orders to this JSON-lines log.")
+    parser.add_argument("--gestures", action="store_true",
+                        help="Swipe to change category, pinch to select or confirm, fist to cancel.")
+    parser.add_argument("--record", help="Record hand landmarks to this file for replay (python -m core.recording).")
+    parser.add_argument("--mirror-landmarks", action="store_true",
+                        help="Mirror hand landmarks instead of flipping every camera frame.")
+    parser.add_argument("--headless", metavar="NAME", nargs="?", const="touchless-tray",
+                        help="Publish frames to shared memory instead of a window (view with python -m ui.viewer).")
+    parser.add_argument("--fps", type=float, default=30.0, help="Target frame rate; 0 runs unpaced.")
+    parser.add_argument("--threads", type=int, help="OpenCV thread budget for this instance.")
+    parser.add_argument("--cpus", type=lambda text: {int(cpu) for cpu in text.split(",")},
+                        help="Comma-separated CPUs to pin this instance to; the only limit that also bounds inference.")
+    parser.add_argument("--metrics-port", type=int, help="Serve stage timings in Prometheus format on localhost.")
+    parser.add_argument("--metrics-file", help="Write a JSON snapshot of stage timings to this file periodically.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    apply_thread_budget(args.threads, args.cpus)
+    writers = []
+    if args.db:
+        writers.append(database_writer(args.db))
+    if args.log:
+        writers.append(log_writer(args.log))
+    for writer in writers:
+        writer.install_signal_handlers()
+    if args.metrics_port:
+        METRICS.serve(args.metrics_port)
+    if args.metrics_file:
+        METRICS.write_snapshots(args.metrics_file)
+
+    app = TouchlessTray(
+        adaptive_inference=args.adaptive,
+        scheduler=InferenceScheduler() if args.idle_scheduler else None,
+        order_sink=persist_to(*writers) if writers else None,
+        menu=Menu(args.menu) if args.menu else None,
+        mirror_landmarks=args.mirror_landmarks,
+        recognizer=GestureRecognizer() if args.gestures else None,
+        recorder=LandmarkRecorder(args.record) if args.record else None,
+        pacer=FramePacer(args.fps),
+    )
+    try:
+        app.run(pipelined=args.pipelined, source=args.source,
+                display=SharedFrameDisplay(args.headless) if args.headless else None)
+    finally:
+        if app.recorder is not None:
+            app.recorder.close()
+        for writer in writers:
+            writer.close()
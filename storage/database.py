@@ -1,37 +1,322 @@
 # Database Manager Class
 import sqlite3
+import time
+from collections import Counter
+from itertools import groupby
+
+SCHEMA_VERSION = 3
+
+
 class DatabaseManager:
-    def __init__(self, db_name="orders.db"):
+    def __init__(self, db_name="orders.db", synchronous="NORMAL", readonly=False):
+        """
+        Open the database in WAL mode.
+        Args:
+            db_name: Path of the SQLite database.
+            synchronous: SQLite synchronous level; NORMAL is crash-safe in WAL mode
+                and only fsyncs at checkpoints, FULL fsyncs every commit.
+            readonly: Open an existing database for reading only; in WAL mode
+                readers never block the writer, nor are they blocked by it.
+        """
+        if readonly:
+            self.conn = sqlite3.connect(f'file:{db_name}?mode=ro', uri=True)
+            self.cursor = self.conn.cursor()
+            return
         self.conn = sqlite3.connect(db_name)
         self.cursor = self.conn.cursor()
+        self.cursor.execute('PRAGMA journal_mode=WAL')
+        self.cursor.execute(f'PRAGMA synchronous={synchronous}')
 
     def create_order_table(self):
         """
-        Create a table to store orders if it doesn't exist.
+        Create the order tables if they don't exist, migrating older layouts.
+        Prices and revenue are stored as integer cents, so sums never drift.
+        """
+        columns = [row[1] for row in self.cursor.execute('PRAGMA table_info(orders)')]
+        legacy = columns and 'created_at' not in columns
+        # Schema 2 stored prices and revenue as REAL
+        float_prices = 'unit_price' in [row[1] for row in self.cursor.execute('PRAGMA table_info(order_items)')]
+
+        self.cursor.execute('BEGIN IMMEDIATE')
+        try:
+            if legacy:
+                self.cursor.execute('ALTER TABLE orders RENAME TO orders_legacy')
+            if float_prices:
+                self._set_aside_float_prices()
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS orders (
+                    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS order_items (
+                    order_id INTEGER NOT NULL REFERENCES orders(order_id),
+                    item TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    unit_price_cents INTEGER,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at)')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)')
+            self.cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_order_items_item ON order_items(item, created_at)'
+            )
+            if float_prices:
+                self.cursor.execute('''
+                    INSERT INTO order_items (order_id, item, quantity, unit_price_cents, created_at)
+                    SELECT order_id, item, quantity, CAST(round(unit_price * 100) AS INTEGER), created_at
+                    FROM order_items_v2 ORDER BY rowid
+                ''')
+                self.cursor.execute('DROP TABLE order_items_v2')
+            self._create_summaries()
+            if legacy:
+                self._migrate_legacy(columns)
+            self.cursor.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _set_aside_float_prices(self):
+        """
+        Move a schema 2 order_items table (REAL unit_price) aside as order_items_v2,
+        to be copied back in cents. The summaries are derived data, so they are
+        dropped and backfilled again from the converted line items.
+        """
+        for trigger in ('orders_summary', 'order_items_summary'):
+            self.cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        for table in ('daily_revenue', 'item_counts'):
+            self.cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        for index in ('idx_order_items_order', 'idx_order_items_item'):
+            self.cursor.execute(f'DROP INDEX IF EXISTS {index}')
+        self.cursor.execute('ALTER TABLE order_items RENAME TO order_items_v2')
+
+    def _create_summaries(self):
+        """
+        Create the sales summary tables and the triggers that keep them current.
+        Each insert into orders/order_items updates its day and item rows in the
+        same transaction, so reports never scan the order history. Tables created
+        on an existing database are backfilled once from the orders already stored.
         """
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_revenue'")
+        exists = self.cursor.fetchone() is not None
         self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS orders (
-                order_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                items TEXT
+            CREATE TABLE IF NOT EXISTS daily_revenue (
+                day TEXT PRIMARY KEY,
+                order_count INTEGER NOT NULL DEFAULT 0,
+                revenue_cents INTEGER NOT NULL DEFAULT 0
             )
         ''')
-        self.conn.commit()
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS item_counts (
+                item TEXT PRIMARY KEY,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                revenue_cents INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        if not exists:
+            self.cursor.execute('''
+                INSERT INTO daily_revenue (day, order_count, revenue_cents)
+                SELECT date(o.created_at, 'unixepoch', 'localtime'), COUNT(*),
+                       COALESCE(SUM((SELECT SUM(i.quantity * COALESCE(i.unit_price_cents, 0))
+                                     FROM order_items i WHERE i.order_id = o.order_id)), 0)
+                FROM orders o GROUP BY 1
+            ''')
+            self.cursor.execute('''
+                INSERT INTO item_counts (item, quantity, revenue_cents)
+                SELECT item, SUM(quantity), SUM(quantity * COALESCE(unit_price_cents, 0))
+                FROM order_items GROUP BY item
+            ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS orders_summary AFTER INSERT ON orders BEGIN
+                INSERT INTO daily_revenue (day, order_count) VALUES (date(NEW.created_at, 'unixepoch', 'localtime'), 1)
+                ON CONFLICT (day) DO UPDATE SET order_count = order_count + 1;
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS order_items_summary AFTER INSERT ON order_items BEGIN
+                INSERT INTO daily_revenue (day, revenue_cents)
+                VALUES (date(NEW.created_at, 'unixepoch', 'localtime'), NEW.quantity * COALESCE(NEW.unit_price_cents, 0))
+                ON CONFLICT (day) DO UPDATE SET revenue_cents = revenue_cents + excluded.revenue_cents;
+                INSERT INTO item_counts (item, quantity, revenue_cents)
+                VALUES (NEW.item, NEW.quantity, NEW.quantity * COALESCE(NEW.unit_price_cents, 0))
+                ON CONFLICT (item) DO UPDATE SET quantity = quantity + excluded.quantity,
+                                                 revenue_cents = revenue_cents + excluded.revenue_cents;
+            END
+        ''')
 
-    def insert_order(self, order):
+    def _migrate_legacy(self, columns):
+        """
+        Copy orders from a pre-normalization table (kept as orders_legacy) into the new tables.
+        Two layouts are known: (order_id, items) with comma-joined item names, and
+        (id, item, options) with one item per row. Neither stored prices or times,
+        so unit_price_cents is left NULL and created_at is the migration time.
+        """
+        migrated_at = time.time()
+        if 'items' in columns:
+            rows = self.cursor.execute('SELECT order_id, items FROM orders_legacy').fetchall()
+            orders = [(order_id, Counter(filter(None, (items or '').split(', ')))) for order_id, items in rows]
+        else:
+            rows = self.cursor.execute('SELECT id, item FROM orders_legacy').fetchall()
+            orders = [(order_id, Counter([item])) for order_id, item in rows]
+
+        self.cursor.executemany(
+            'INSERT INTO orders (order_id, created_at) VALUES (?, ?)',
+            [(order_id, migrated_at) for order_id, _ in orders],
+        )
+        self.cursor.executemany(
+            'INSERT INTO order_items (order_id, item, quantity, unit_price_cents, created_at) VALUES (?, ?, ?, NULL, ?)',
+            [(order_id, item, quantity, migrated_at)
+             for order_id, items in orders for item, quantity in items.items()],
+        )
+
+    @staticmethod
+    def _line_items(order):
+        """
+        Normalize an order into (item, quantity, unit_price) tuples.
+        Accepts a list of item names (repeated names are counted), a list of
+        (item, quantity, unit_price) tuples, a {item: {"quantity", "price"}} dict,
+        or a core.order.Order.
+        """
+        if hasattr(order, 'to_records'):
+            return order.to_records()
+        if isinstance(order, dict):
+            return [(item, details['quantity'], details.get('price')) for item, details in order.items()]
+        if order and not isinstance(order[0], str):
+            return [tuple(line) for line in order]
+        return [(item, quantity, None) for item, quantity in Counter(order).items()]
+
+    def insert_order(self, order, created_at=None):
         """
         Insert a new order into the database.
         Args:
-            order: List of items in the order.
+            order: List of items in the order, list of (item, quantity, unit_price)
+                tuples, {item: {"quantity", "price"}} dict, or Order.
+            created_at: Unix time of the order (defaults to now).
+        Returns:
+            The new order_id.
+        """
+        return self.insert_orders([order], created_at)[0]
+
+    def insert_orders(self, orders, created_at=None):
+        """
+        Insert many orders in a single transaction with batched statements.
+        Args:
+            orders: Iterable of orders in any format accepted by insert_order.
+            created_at: Unix time applied to every order (defaults to now).
+        Returns:
+            List of the new order_ids, in input order.
+        """
+        created_at = time.time() if created_at is None else created_at
+        orders = [self._line_items(order) for order in orders]
+        if not orders:
+            return []
+
+        # The write lock is taken up front, so ids can be allocated before the batched inserts
+        self.cursor.execute('BEGIN IMMEDIATE')
+        try:
+            self.cursor.execute(
+                "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'orders'), 0),"
+                " COALESCE((SELECT MAX(order_id) FROM orders), 0))"
+            )
+            first_id = self.cursor.fetchone()[0] + 1
+            order_ids = list(range(first_id, first_id + len(orders)))
+            self.cursor.executemany(
+                'INSERT INTO orders (order_id, created_at) VALUES (?, ?)',
+                [(order_id, created_at) for order_id in order_ids],
+            )
+            self.cursor.executemany(
+                'INSERT INTO order_items (order_id, item, quantity, unit_price_cents, created_at) VALUES (?, ?, ?, ?, ?)',
+                [(order_id, item, quantity, None if unit_price is None else round(unit_price * 100), created_at)
+                 for order_id, lines in zip(order_ids, orders) for item, quantity, unit_price in lines],
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return order_ids
+
+    def retrieve_orders_page(self, after_id=0, limit=100):
+        """
+        Retrieve one page of orders using keyset pagination on order_id.
+        Args:
+            after_id: Only orders with a larger order_id are returned; pass the
+                last order_id of the previous page to get the next one.
+            limit: Maximum number of orders in the page.
+        Returns:
+            List of (order_id, created_at, items) tuples, where items is a list of
+            (item, quantity, unit_price) tuples.
         """
-        order_items = ', '.join(order)
-        self.cursor.execute('INSERT INTO orders (items) VALUES (?)', (order_items,))
-        self.conn.commit()
+        self.cursor.execute('''
+            SELECT o.order_id, o.created_at, i.item, i.quantity, i.unit_price_cents / 100.0
+            FROM (SELECT order_id, created_at FROM orders WHERE order_id > ? ORDER BY order_id LIMIT ?) o
+            LEFT JOIN order_items i ON i.order_id = o.order_id
+            ORDER BY o.order_id, i.rowid
+        ''', (after_id, limit))
+        return [
+            (order_id, created_at, [row[2:] for row in rows if row[2] is not None])
+            for (order_id, created_at), rows in groupby(self.cursor.fetchall(), key=lambda row: row[:2])
+        ]
+
+    def iter_orders(self, chunk_size=500, after_id=0):
+        """
+        Stream orders in order_id order, holding at most one chunk in memory.
+        Args:
+            chunk_size: Number of orders fetched per query.
+            after_id: Start after this order_id.
+        Yields:
+            (order_id, created_at, items) tuples as returned by retrieve_orders_page.
+        """
+        while True:
+            page = self.retrieve_orders_page(after_id, chunk_size)
+            yield from page
+            if len(page) < chunk_size:
+                return
+            after_id = page[-1][0]
 
     def retrieve_orders(self):
         """
         Retrieve all saved orders from the database.
         Returns:
-            List of tuples containing order records.
+            List of (order_id, created_at, items) tuples, where items is a list of
+            (item, quantity, unit_price) tuples.
+        """
+        return list(self.iter_orders())
+
+    def daily_revenue(self, start_day=None, end_day=None):
+        """
+        Retrieve the incrementally maintained per-day totals.
+        Args:
+            start_day: First day to include, as 'YYYY-MM-DD' (optional).
+            end_day: Last day to include, as 'YYYY-MM-DD' (optional).
+        Returns:
+            List of (day, order_count, revenue) tuples ordered by day.
         """
-        self.cursor.execute('SELECT * FROM orders')
+        self.cursor.execute(
+            'SELECT day, order_count, revenue_cents / 100.0 FROM daily_revenue'
+            ' WHERE day >= ? AND day <= ? ORDER BY day',
+            (start_day or '', end_day or '9999-12-31'),
+        )
         return self.cursor.fetchall()
+
+    def item_counts(self, limit=None):
+        """
+        Retrieve the incrementally maintained per-item totals.
+        Args:
+            limit: Only return the top items by quantity (optional).
+        Returns:
+            List of (item, quantity, revenue) tuples, best sellers first.
+        """
+        self.cursor.execute(
+            'SELECT item, quantity, revenue_cents / 100.0 FROM item_counts ORDER BY quantity DESC, item LIMIT ?',
+            (-1 if limit is None else limit,),
+        )
+        return self.cursor.fetchall()
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.conn.close()
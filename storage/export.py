@@ -0,0 +1,184 @@
+# Incremental order exporter
+import argparse
+import csv
+import gzip
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from storage.database import DatabaseManager
+
+FORMATS = ("npz", "csv.gz")
+COLUMNS = ("order_id", "created_at", "item", "quantity", "unit_price")
+
+
+class OrderExporter:
+    def __init__(self, db_name="orders.db", out_dir="exports", fmt="npz", chunk_orders=10000, page_size=1000):
+        """
+        Exports new orders from the database into append-only chunk files, one
+        row per line item, so consumers never query the live database.
+        A high-water mark on order_id is persisted with a manifest of the chunks
+        in out_dir/manifest.json; each run reads only the orders after it, through
+        a read-only connection and keyset pages. Chunks and manifest are replaced
+        atomically, and a chunk is listed only once it is complete.
+        Args:
+            db_name: Path of the SQLite database.
+            out_dir: Directory holding the chunks and the manifest.
+            fmt: "npz" (compressed NumPy columns) or "csv.gz".
+            chunk_orders: Maximum orders per chunk file.
+            page_size: Orders read per query.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}', expected one of {FORMATS}.")
+        self.db_name = db_name
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.chunk_orders = chunk_orders
+        self.page_size = page_size
+        self.manifest_path = os.path.join(out_dir, "manifest.json")
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"high_water_mark": 0, "chunks": []}
+        with open(self.manifest_path) as file:
+            return json.load(file)
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    @property
+    def high_water_mark(self):
+        """Largest order_id already exported."""
+        return self.manifest["high_water_mark"]
+
+    @staticmethod
+    def _columns(orders):
+        """Flattens (order_id, created_at, items) tuples into line item columns."""
+        lines = [(order_id, created_at, item, quantity, unit_price)
+                 for order_id, created_at, items in orders for item, quantity, unit_price in items]
+        order_id, created_at, item, quantity, unit_price = zip(*lines) if lines else ((),) * 5
+        return {
+            "order_id": np.array(order_id, dtype=np.int64),
+            "created_at": np.array(created_at, dtype=np.float64),
+            "item": np.array(item, dtype=str),
+            "quantity": np.array(quantity, dtype=np.int32),
+            "unit_price": np.array([np.nan if price is None else price for price in unit_price], dtype=np.float64),
+        }
+
+    def _write_chunk(self, orders):
+        """Writes one chunk file and records it in the manifest."""
+        first_id, last_id = orders[0][0], orders[-1][0]
+        name = f"orders-{first_id:012d}-{last_id:012d}.{self.fmt}"
+        path = os.path.join(self.out_dir, name)
+        columns = self._columns(orders)
+        tmp_path = path + ".tmp"
+        if self.fmt == "npz":
+            with open(tmp_path, "wb") as file:
+                np.savez_compressed(file, **columns)
+        else:
+            with gzip.open(tmp_path, "wt", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(COLUMNS)
+                writer.writerows(zip(*(columns[column].tolist() for column in COLUMNS)))
+        os.replace(tmp_path, path)
+
+        self.manifest["chunks"].append({
+            "file": name,
+            "first_order_id": first_id,
+            "last_order_id": last_id,
+            "orders": len(orders),
+            "lines": len(columns["order_id"]),
+        })
+        self.manifest["high_water_mark"] = last_id
+        self._save_manifest()
+        logging.info("Exported orders %d-%d (%d line items) to %s", first_id, last_id, len(columns["order_id"]), name)
+
+    def export(self):
+        """
+        Exports every order newer than the high-water mark.
+        Returns:
+            Number of orders exported.
+        """
+        db = DatabaseManager(self.db_name, readonly=True)
+        exported = 0
+        try:
+            pending = []
+            for order in db.iter_orders(self.page_size, self.high_water_mark):
+                pending.append(order)
+                if len(pending) == self.chunk_orders:
+                    self._write_chunk(pending)
+                    exported += len(pending)
+                    pending = []
+            if pending:
+                self._write_chunk(pending)
+                exported += len(pending)
+        finally:
+            db.close()
+        return exported
+
+    def run_forever(self, interval=60.0, stop_event=None):
+        """
+        Exports new orders every interval seconds until stop_event is set.
+        Errors are logged and retried on the next run.
+        Args:
+            interval: Seconds between runs.
+            stop_event: Optional threading.Event that stops the loop.
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.export()
+            except Exception as e:
+                logging.error("Order export failed: %s", e)
+            stop_event.wait(interval)
+
+    def chunk_paths(self):
+        """
+        Returns the paths of the exported chunks, oldest first.
+        """
+        return [os.path.join(self.out_dir, chunk["file"]) for chunk in self.manifest["chunks"]]
+
+
+def load_chunk(path):
+    """
+    Reads an exported chunk.
+    Args:
+        path: Path of a .npz or .csv.gz chunk.
+    Returns:
+        Dict of column name -> NumPy array.
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return {column: data[column] for column in COLUMNS}
+    with gzip.open(path, "rt", newline="") as file:
+        rows = list(csv.DictReader(file))
+    return OrderExporter._columns(
+        (int(row["order_id"]), float(row["created_at"]),
+         [(row["item"], int(row["quantity"]), None if row["unit_price"] == "nan" else float(row["unit_price"]))])
+        for row in rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export new orders to compressed chunk files.")
+    parser.add_argument("db", help="SQLite order database.")
+    parser.add_argument("out_dir", help="Directory for the chunks and manifest.json.")
+    parser.add_argument("--format", choices=FORMATS, default="npz", help="Chunk file format.")
+    parser.add_argument("--chunk-orders", type=int, default=10000, help="Maximum orders per chunk.")
+    parser.add_argument("--interval", type=float, help="Keep running, exporting every INTERVAL seconds.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    exporter = OrderExporter(args.db, args.out_dir, args.format, args.chunk_orders)
+    if args.interval:
+        exporter.run_forever(args.interval)
+    else:
+        print(f"Exported {exporter.export()} orders; high-water mark {exporter.high_water_mark}")
@@ -0,0 +1,250 @@
+# Write-behind persistence worker
+import atexit
+import logging
+import queue
+import signal
+import sqlite3
+import threading
+import time
+
+from utils.metrics import METRICS
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    def __init__(self, open_sink, write_batch, maxsize=10000, batch_size=64, flush_interval=0.05,
+                 block_timeout=0.0, retries=8, retry_delay=0.02, name="order-writer"):
+        """
+        Moves persistence off the caller's thread.
+        Records are queued by submit() and written in batches by a background
+        thread that owns the sink, so a slow disk or a locked database never
+        blocks the frame loop. Pending records are flushed on close(), at
+        interpreter exit, and on SIGTERM/SIGINT once install_signal_handlers() is called.
+        If the sink cannot be opened or a batch cannot be written, the queue fails:
+        the error is kept in self.error, queued records are counted as failed and
+        submit() returns False from then on.
+        Args:
+            open_sink: Called once on the worker thread to create the sink
+                (e.g. a DatabaseManager, whose connection must live on that thread).
+            write_batch: Called as write_batch(sink, records) for each batch.
+            maxsize: Queue capacity; submit() fails once it is full (backpressure).
+            batch_size: Maximum records per write.
+            flush_interval: Maximum seconds to wait for a batch to fill up.
+            block_timeout: Seconds submit() may wait for room in a full queue
+                (0 never waits, None waits as long as needed).
+            retries: Attempts for a batch failing with "database is locked/busy".
+            retry_delay: Initial retry delay in seconds, doubled on each attempt.
+            name: Name of the worker thread.
+        """
+        self.open_sink = open_sink
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        self._queue = queue.Queue(maxsize)
+        self._closed = False
+        # Orders submit() against close() and the worker failing; reentrant because
+        # close() also runs from signal handlers, on whatever thread was submitting
+        self._lock = threading.RLock()
+        self.error = None
+        self.stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "retries": 0,
+            "max_depth": 0,
+            "last_write_seconds": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def depth(self):
+        """Number of records waiting to be written."""
+        return self._queue.qsize()
+
+    def submit(self, record):
+        """
+        Queues a record without blocking (beyond block_timeout).
+        Args:
+            record: The record to persist.
+        Returns:
+            True if queued, False if the queue is full, closed or failed.
+        """
+        with self._lock:
+            if self._closed or self.error is not None:
+                return False
+            try:
+                if self.block_timeout == 0:
+                    self._queue.put_nowait(record)
+                else:
+                    self._queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                self.stats["rejected"] += 1
+                return False
+            if self._closed and not self._thread.is_alive():
+                # close() ran from a signal handler during the put and the worker is gone
+                self.stats["rejected"] += 1
+                return False
+        self.stats["submitted"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+        return True
+
+    def _drain(self):
+        """Takes every record still queued, skipping stop markers."""
+        batch = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                return batch
+            if record is not _STOP:
+                batch.append(record)
+
+    def _next_batch(self):
+        """Blocks for the first record, then gathers more for up to flush_interval."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                record = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is _STOP:
+                self._queue.put(_STOP)  # Seen again once this batch is written
+                break
+            batch.append(record)
+        return batch
+
+    def _write(self, sink, batch):
+        """Writes one batch, retrying while the database is locked."""
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            try:
+                start = time.perf_counter()
+                self.write_batch(sink, batch)
+                self.stats["last_write_seconds"] = elapsed = time.perf_counter() - start
+                METRICS.observe("persist", elapsed)
+                METRICS.set_gauge("persist_queue_depth", self._queue.qsize())
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                return
+            except sqlite3.OperationalError as e:
+                message = str(e)
+                if ("locked" not in message and "busy" not in message) or attempt == self.retries:
+                    raise
+                self.stats["retries"] += 1
+                time.sleep(delay)
+                delay *= 2
+
+    def _fail(self, error, lost=0):
+        """Marks the queue failed and drops the records still queued."""
+        with self._lock:
+            self.error = error
+            lost += len(self._drain())
+        self.stats["failed"] += lost
+        logging.error("%s failed, %d records not persisted: %s", self._thread.name, lost, error)
+
+    def _run(self):
+        try:
+            sink = self.open_sink()
+        except Exception as e:
+            self._fail(e)
+            return
+        try:
+            stopping = False
+            while True:
+                batch = self._drain() if stopping else self._next_batch()
+                if batch is None:
+                    # Records that landed behind the stop marker are still written
+                    stopping = True
+                    batch = self._drain()
+                if not batch:
+                    break
+                try:
+                    self._write(sink, batch)
+                except Exception as e:
+                    self._fail(e, len(batch))
+                    break
+        finally:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+
+    def close(self, timeout=None):
+        """
+        Stops accepting records and waits until every queued record is written.
+        Args:
+            timeout: Maximum seconds to wait for the flush (None waits until done).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # The worker may have stopped with a full queue, so never block on the put
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def install_signal_handlers(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """
+        Flushes the queue before the process handles SIGTERM/SIGINT as it normally would.
+        Must be called from the main thread.
+        """
+        for signum in signals:
+            previous = signal.getsignal(signum)
+
+            def handler(received, frame, previous=previous):
+                self.close()
+                if callable(previous):
+                    previous(received, frame)
+                elif previous == signal.SIG_DFL:
+                    signal.signal(received, signal.SIG_DFL)
+                    signal.raise_signal(received)
+
+            signal.signal(signum, handler)
+
+
+def database_writer(db_name="orders.db", **kwargs):
+    """
+    Write-behind queue in front of a DatabaseManager; records are orders in any
+    format accepted by DatabaseManager.insert_order.
+    """
+    from storage.database import DatabaseManager
+
+    def open_sink():
+        db = DatabaseManager(db_name)
+        db.create_order_table()
+        return db
+
+    return WriteBehindQueue(open_sink, lambda db, batch: db.insert_orders(batch), **kwargs)
+
+
+def log_writer(file_path, **kwargs):
+    """
+    Write-behind queue in front of a StorageManager JSON-lines log.
+    """
+    from core.feedback import StorageManager
+
+    def write_batch(log, batch):
+        log.save_orders(batch)
+        log.flush()
+
+    return WriteBehindQueue(lambda: StorageManager(file_path), write_batch, **kwargs)
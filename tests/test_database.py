@@ -0,0 +1,162 @@
+import os
+import sqlite3
+
+from storage.database import SCHEMA_VERSION, DatabaseManager
+
+REPO_DB = os.path.join(os.path.dirname(__file__), os.pardir, "orders.db")
+DAY = 1700000000.0  # A fixed order time; summary days depend on the local time zone
+
+
+def open_db(path):
+    db = DatabaseManager(str(path))
+    db.create_order_table()
+    return db
+
+
+def test_revenue_is_kept_in_whole_cents(tmp_path):
+    db = open_db(tmp_path / "orders.db")
+    for _ in range(10):
+        db.insert_orders([[("Tea", 1, 0.1)]] * 100, created_at=DAY)
+
+    assert db.daily_revenue()[0][1:] == (1000, 100.0)
+    assert db.item_counts() == [("Tea", 1000, 100.0)]
+    assert db.retrieve_orders_page(limit=1)[0][2] == [("Tea", 1, 0.1)]
+
+
+def test_schema_2_prices_are_converted_to_cents(tmp_path):
+    path = str(tmp_path / "orders.db")
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE orders (order_id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL);
+        CREATE TABLE order_items (order_id INTEGER NOT NULL REFERENCES orders(order_id), item TEXT NOT NULL,
+                                  quantity INTEGER NOT NULL, unit_price REAL, created_at REAL NOT NULL);
+        CREATE TABLE daily_revenue (day TEXT PRIMARY KEY, order_count INTEGER NOT NULL DEFAULT 0,
+                                    revenue REAL NOT NULL DEFAULT 0);
+        CREATE TABLE item_counts (item TEXT PRIMARY KEY, quantity INTEGER NOT NULL DEFAULT 0,
+                                  revenue REAL NOT NULL DEFAULT 0);
+        INSERT INTO orders VALUES (1, 1700000000.0), (2, 1700000000.0);
+        INSERT INTO order_items VALUES (1, 'Burger', 2, 5.5, 1700000000.0), (2, 'Water', 1, NULL, 1700000000.0);
+        PRAGMA user_version=2;
+    ''')
+    conn.close()
+
+    db = open_db(path)
+    assert db.retrieve_orders() == [(1, DAY, [("Burger", 2, 5.5)]), (2, DAY, [("Water", 1, None)])]
+    assert [row[1:] for row in db.daily_revenue()] == [(2, 11.0)]
+    assert db.item_counts() == [("Burger", 2, 11.0), ("Water", 1, 0.0)]
+    db.insert_order([("Burger", 1, 5.5)], created_at=DAY)
+    assert db.item_counts()[0] == ("Burger", 3, 16.5)
+    assert db.cursor.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+
+
+def test_comma_joined_legacy_orders_are_migrated(tmp_path):
+    path = str(tmp_path / "orders.db")
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE orders (order_id INTEGER PRIMARY KEY AUTOINCREMENT, items TEXT)')
+    conn.executemany('INSERT INTO orders VALUES (?, ?)', [(1, 'Burger, Burger, Coke'), (2, ''), (4, 'Fries')])
+    conn.commit()
+    conn.close()
+
+    db = open_db(path)
+    orders = [(order_id, items) for order_id, _, items in db.retrieve_orders()]
+    assert orders == [(1, [("Burger", 2, None), ("Coke", 1, None)]), (2, []), (4, [("Fries", 1, None)])]
+    assert db.insert_order(["Coke"]) == 5
+    assert db.cursor.execute('SELECT COUNT(*) FROM orders_legacy').fetchone()[0] == 3
+
+
+def test_repository_database_is_migrated(tmp_path):
+    # The checked-in orders.db has the one-item-per-row layout (id, item, options)
+    path = str(tmp_path / "orders.db")
+    with sqlite3.connect(f"file:{REPO_DB}?mode=ro", uri=True) as source, sqlite3.connect(path) as copy:
+        source.backup(copy)
+    conn = sqlite3.connect(path)
+    conn.executemany('INSERT INTO orders (id, item, options) VALUES (?, ?, ?)',
+                     [(1, 'Burger', None), (2, 'Coke', 'no ice'), (3, 'Burger', None)])
+    conn.commit()
+    conn.close()
+
+    db = open_db(path)
+    orders = [(order_id, items) for order_id, _, items in db.retrieve_orders()]
+    assert orders == [(1, [("Burger", 1, None)]), (2, [("Coke", 1, None)]), (3, [("Burger", 1, None)])]
+    assert db.item_counts() == [("Burger", 2, 0.0), ("Coke", 1, 0.0)]
+    open_db(path)  # Opening the migrated database again changes nothing
+    assert len(db.retrieve_orders()) == 3
+
+
+def test_batched_ids_continue_across_batches_and_are_never_reused(tmp_path):
+    db = open_db(tmp_path / "orders.db")
+    assert db.insert_orders([["Burger"], ["Coke"], ["Fries"]]) == [1, 2, 3]
+    assert db.insert_orders([["Tea"], ["Water"]]) == [4, 5]
+    db.cursor.execute('DELETE FROM order_items WHERE order_id = 5')
+    db.cursor.execute('DELETE FROM orders WHERE order_id = 5')
+    db.conn.commit()
+
+    assert db.insert_order(["Coke"]) == 6
+    assert db.insert_orders([]) == []
+    assert [items for order_id, _, items in db.retrieve_orders() if order_id in (3, 6)] == [
+        [("Fries", 1, None)], [("Coke", 1, None)]]
+
+
+def test_order_formats_are_normalized(tmp_path):
+    from core.order import Order
+
+    order = Order()
+    order.add_item("Burger", quantity=2, price=5.5)
+    db = open_db(tmp_path / "orders.db")
+    db.insert_orders([
+        ["Burger", "Coke", "Burger"],
+        [("Fries", 3, 2.25)],
+        {"Tea": {"quantity": 1, "price": 1.1}},
+        order,
+    ])
+
+    assert [items for _, _, items in db.retrieve_orders()] == [
+        [("Burger", 2, None), ("Coke", 1, None)],
+        [("Fries", 3, 2.25)],
+        [("Tea", 1, 1.1)],
+        [("Burger", 2, 5.5)],
+    ]
+
+
+def test_summaries_follow_inserts(tmp_path):
+    db = open_db(tmp_path / "orders.db")
+    db.insert_orders([[("Burger", 2, 5.5), ("Coke", 1, 2)], [("Coke", 3, 2)]], created_at=DAY)
+    db.insert_order([("Burger", 1, 5.5)], created_at=DAY + 86400)
+
+    assert [row[1:] for row in db.daily_revenue()] == [(2, 19.0), (1, 5.5)]
+    first_day = db.daily_revenue()[0][0]
+    assert db.daily_revenue(end_day=first_day) == [(first_day, 2, 19.0)]
+    assert db.item_counts() == [("Coke", 4, 8.0), ("Burger", 3, 16.5)]
+    assert db.item_counts(limit=1) == [("Coke", 4, 8.0)]
+
+
+def test_summaries_are_backfilled_from_existing_orders(tmp_path):
+    db = open_db(tmp_path / "orders.db")
+    db.insert_orders([[("Burger", 2, 5.5)], [], [("Coke", 1, 2)]], created_at=DAY)
+    expected = db.daily_revenue(), db.item_counts()
+    # A database written before the summaries existed
+    for statement in ('DROP TRIGGER orders_summary', 'DROP TRIGGER order_items_summary',
+                      'DROP TABLE daily_revenue', 'DROP TABLE item_counts'):
+        db.cursor.execute(statement)
+    db.conn.commit()
+
+    db = open_db(tmp_path / "orders.db")
+    assert (db.daily_revenue(), db.item_counts()) == expected
+    db.insert_order([("Coke", 1, 2)], created_at=DAY)
+    assert db.item_counts()[1] == ("Coke", 2, 4.0)
+
+
+def test_keyset_pages_cover_every_order_once(tmp_path):
+    db = open_db(tmp_path / "orders.db")
+    db.insert_orders([[("Burger", 1, 5)], [], [("Coke", 1, 2), ("Fries", 2, 3)], [], []], created_at=DAY)
+
+    assert db.retrieve_orders_page(limit=0) == []
+    page = db.retrieve_orders_page(limit=2)
+    assert page == [(1, DAY, [("Burger", 1, 5.0)]), (2, DAY, [])]  # An order without items is still a row
+    page = db.retrieve_orders_page(after_id=page[-1][0], limit=2)
+    assert page == [(3, DAY, [("Coke", 1, 2.0), ("Fries", 2, 3.0)]), (4, DAY, [])]
+    assert db.retrieve_orders_page(after_id=4, limit=2) == [(5, DAY, [])]
+    assert db.retrieve_orders_page(after_id=5) == []
+    # Chunks that divide the orders exactly still end without an extra order
+    assert [order_id for order_id, _, _ in db.iter_orders(chunk_size=5)] == [1, 2, 3, 4, 5]
+    assert [order_id for order_id, _, _ in db.iter_orders(chunk_size=2, after_id=1)] == [2, 3, 4, 5]
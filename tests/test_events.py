@@ -0,0 +1,88 @@
+from core.events import EmaFilter, GestureEventEngine
+from ui.navigation import Button, ScreenLayout
+
+FRAME = 1 / 30
+
+
+def make_engine(**kwargs):
+    layout = ScreenLayout([
+        Button("A", (0, 0, 100, 100), (0, 255, 0), ("goto", "A")),
+        Button("B", (200, 0, 300, 100), (0, 255, 0), ("goto", "B")),
+    ])
+    kwargs.setdefault("smoothing", EmaFilter(1.0))  # No smoothing: the points are exact
+    return GestureEventEngine(layout.hit_test, **kwargs)
+
+
+def feed(engine, point, start, seconds):
+    """Feeds one point for a number of seconds; returns the select events and the end time."""
+    selects = []
+    t = start
+    while t < start + seconds:
+        selects += [event for event in engine.update(point, t) if event.kind == "select"]
+        t += FRAME
+    return selects, t
+
+
+def test_dwell_selects_once():
+    engine = make_engine(dwell_time=0.5, cooldown=0.2)
+    selects, _ = feed(engine, (50, 50), 0.0, 3.0)
+
+    assert [event.target.label for event in selects] == ["A"]
+
+
+def test_dwell_repeats_when_enabled():
+    engine = make_engine(dwell_time=0.5, cooldown=0.2, repeat=True)
+    selects, _ = feed(engine, (50, 50), 0.0, 2.0)
+
+    assert len(selects) == 3
+
+
+def test_leaving_before_dwell_time_does_not_select():
+    engine = make_engine(dwell_time=0.5, exit_grace=0.1)
+    selects, t = feed(engine, (50, 50), 0.0, 0.4)
+    more, t = feed(engine, (150, 50), t, 0.3)
+    selects += more
+    more, _ = feed(engine, (250, 50), t, 0.4)
+
+    assert selects + more == []
+    assert engine.target.label == "B"
+
+
+def test_brief_exit_within_grace_keeps_dwell():
+    engine = make_engine(dwell_time=0.5, exit_grace=0.15)
+    selects, t = feed(engine, (50, 50), 0.0, 0.3)
+    more, t = feed(engine, (150, 50), t, 0.05)
+    selects += more
+    more, _ = feed(engine, (50, 50), t, 0.3)
+
+    assert [event.target.label for event in selects + more] == ["A"]
+
+
+def test_disarm_waits_until_point_leaves_every_target():
+    engine = make_engine(dwell_time=0.5, exit_grace=0.1)
+    feed(engine, (50, 50), 0.0, 0.2)
+    engine.disarm()
+
+    selects, t = feed(engine, (50, 50), 0.2, 2.0)
+    assert selects == []
+    # Moving straight to another button does not re-arm either
+    selects, t = feed(engine, (250, 50), t, 1.0)
+    assert selects == []
+
+    _, t = feed(engine, (150, 50), t, 0.3)  # Off every button
+    selects, _ = feed(engine, (250, 50), t, 1.0)
+    assert [event.target.label for event in selects] == ["B"]
+
+
+def test_tray_does_not_reselect_after_screen_change():
+    from main1 import TouchlessTray
+
+    # MainMenu "Checkout" and Checkout "Back" share a rect; so do "Start Order" and the first item
+    for point, state in (((250, 400), "Checkout"), ((250, 100), "StartOrder")):
+        app = TouchlessTray()
+        t = 0.0
+        for _ in range(300):
+            t += FRAME
+            app.handle_input(point, t)
+        assert app.current_state == state
+        assert not app.order
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+from storage.database import DatabaseManager
+from storage.export import OrderExporter, load_chunk
+
+DAY = 1700000000.0
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "orders.db")
+    db = DatabaseManager(path)
+    db.create_order_table()
+    db.insert_orders([[("Burger", 2, 5.5), ("Water", 1, None)], [("Coke", 1, 2)]], created_at=DAY)
+    db.close()
+    return path
+
+
+def add_order(db_path, order):
+    db = DatabaseManager(db_path)
+    db.insert_order(order, created_at=DAY)
+    db.close()
+
+
+@pytest.mark.parametrize("fmt", ["npz", "csv.gz"])
+def test_chunks_round_trip_with_null_prices(db_path, tmp_path, fmt):
+    exporter = OrderExporter(db_path, str(tmp_path / "exports"), fmt)
+    assert exporter.export() == 2
+
+    (path,) = exporter.chunk_paths()
+    chunk = load_chunk(path)
+    assert chunk["order_id"].tolist() == [1, 1, 2]
+    assert chunk["created_at"].tolist() == [DAY] * 3
+    assert chunk["item"].tolist() == ["Burger", "Water", "Coke"]
+    assert chunk["quantity"].tolist() == [2, 1, 1]
+    assert chunk["unit_price"][[0, 2]].tolist() == [5.5, 2.0]
+    assert np.isnan(chunk["unit_price"][1])
+
+
+def test_exports_are_incremental(db_path, tmp_path):
+    out_dir = str(tmp_path / "exports")
+    exporter = OrderExporter(db_path, out_dir)
+    assert exporter.export() == 2
+    assert exporter.export() == 0
+    assert len(exporter.chunk_paths()) == 1
+
+    add_order(db_path, [("Fries", 1, 3)])
+    assert exporter.export() == 1
+    new_chunk = exporter.chunk_paths()[-1]
+    assert len(exporter.chunk_paths()) == 2
+    assert load_chunk(new_chunk)["order_id"].tolist() == [3]
+    assert sorted(os.listdir(out_dir)) == sorted([os.path.basename(p) for p in exporter.chunk_paths()]
+                                                 + ["manifest.json"])
+
+
+def test_high_water_mark_survives_reloading_the_manifest(db_path, tmp_path):
+    out_dir = str(tmp_path / "exports")
+    OrderExporter(db_path, out_dir).export()
+
+    exporter = OrderExporter(db_path, out_dir)
+    assert exporter.high_water_mark == 2
+    assert exporter.export() == 0
+    add_order(db_path, [("Tea", 2, 1.1)])
+    add_order(db_path, [])
+    assert OrderExporter(db_path, out_dir).export() == 2
+
+    exporter = OrderExporter(db_path, out_dir)
+    assert exporter.high_water_mark == 4
+    assert [chunk["orders"] for chunk in exporter.manifest["chunks"]] == [2, 2]
+    assert [chunk["lines"] for chunk in exporter.manifest["chunks"]] == [3, 1]
+
+
+def test_large_exports_are_split_into_chunks(db_path, tmp_path):
+    for i in range(5):
+        add_order(db_path, [("Coke", i + 1, 2)])
+    exporter = OrderExporter(db_path, str(tmp_path / "exports"), chunk_orders=3, page_size=2)
+
+    assert exporter.export() == 7
+    assert [(c["first_order_id"], c["last_order_id"]) for c in exporter.manifest["chunks"]] == [(1, 3), (4, 6), (7, 7)]
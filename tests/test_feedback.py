@@ -0,0 +1,86 @@
+import gc
+import json
+import os
+import time
+import weakref
+
+from core.feedback import INDEX_ENTRY, StorageManager
+
+
+def order(i):
+    return {"Burger": {"quantity": 1 + i % 3, "price": 5}, "id": i, "pad": "x" * 200}
+
+
+def test_index_survives_reopening(tmp_path):
+    path = str(tmp_path / "orders.jsonl")
+    with StorageManager(path) as log:
+        log.save_orders([order(i) for i in range(50)])
+
+    log = StorageManager(path)
+    assert log.count() == 50
+    assert log.read_order(42)["id"] == 42
+    assert [o["id"] for o in log.iter_orders(45)] == [45, 46, 47, 48, 49]
+
+
+def test_reader_next_to_writer_never_writes_the_index(tmp_path):
+    path = str(tmp_path / "orders.jsonl")
+    writer = StorageManager(path, flush_every=1000, flush_interval=60)
+    reader = StorageManager(path)
+    for i in range(100):
+        writer.save_order(order(i))
+        if i == 60:
+            reader.count()  # Sees lines spilled to disk before the writer flushed
+    writer.close()
+
+    assert os.path.getsize(path + ".idx") == 100 * INDEX_ENTRY.size
+    assert reader.count() == 100
+    assert next(reader.iter_orders())["id"] == 0
+    assert reader.read_order(60)["id"] == 60
+    assert reader.read_order(150) is None
+
+
+def test_lines_indexed_after_the_fact_are_left_out_of_time_ranges(tmp_path):
+    path = str(tmp_path / "orders.jsonl")
+    with open(path, "w") as legacy:  # A log written before the index existed
+        legacy.writelines(json.dumps(order(i)) + "\n" for i in range(5))
+
+    log = StorageManager(path)
+    assert log.count() == 5
+    assert list(log.orders_between(0, time.time() + 60)) == []
+
+    start = time.time()
+    log.save_orders([order(i) for i in range(5, 8)])
+    log.close()
+    log = StorageManager(path)
+    assert [o["id"] for o in log.orders_between(start, time.time() + 60)] == [5, 6, 7]
+    assert [o["id"] for o in log.iter_orders()] == list(range(8))
+
+
+def test_orders_lost_from_the_index_in_a_crash_are_untimed(tmp_path):
+    path = str(tmp_path / "orders.jsonl")
+    with StorageManager(path) as log:
+        log.save_orders([order(i) for i in range(4)])
+    with open(path, "a") as crashed:  # Written, but the index entries never made it to disk
+        crashed.writelines(json.dumps(order(i)) + "\n" for i in range(4, 6))
+    start = time.time()
+    with StorageManager(path) as log:
+        log.save_orders([order(i) for i in range(6, 8)])
+
+    log = StorageManager(path)
+    assert [o["id"] for o in log.orders_between(0, time.time() + 60)] == [0, 1, 2, 3, 6, 7]
+    assert [o["id"] for o in log.orders_between(start, time.time() + 60)] == [6, 7]
+
+
+def test_only_writing_handles_are_kept_alive_for_exit(tmp_path):
+    path = str(tmp_path / "orders.jsonl")
+    with StorageManager(path) as log:
+        log.save_order(order(0))
+    closed = weakref.ref(log)
+    reader = StorageManager(path)
+    reader.count()
+    unused = weakref.ref(reader)
+    del log, reader
+    gc.collect()
+
+    assert closed() is None
+    assert unused() is None
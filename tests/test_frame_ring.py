@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from ui.frame_ring import SharedFrameRing
+
+SHAPE = (4, 6, 3)
+
+
+@pytest.fixture
+def rings():
+    name = f"test-ring-{os.getpid()}"
+    engine = SharedFrameRing(name, SHAPE, slots=3, create=True)
+    viewer = SharedFrameRing(name)
+    yield engine, viewer
+    viewer.close()
+    engine.close()
+
+
+def frame(value):
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+def test_viewer_copies_the_newest_frame_once(rings):
+    engine, viewer = rings
+    out = np.empty(SHAPE, dtype=np.uint8)
+    assert viewer.copy_latest(out) is None
+
+    for value in (1, 2, 3, 4):
+        engine.publish(frame(value))
+    assert viewer.copy_latest(out) == 4
+    assert (out == 4).all()
+    assert viewer.copy_latest(out, after=4) is None
+
+
+def test_frame_overwritten_during_the_copy_is_skipped(rings):
+    engine, viewer = rings
+    out = np.empty(SHAPE, dtype=np.uint8)
+    engine.publish(frame(1))
+    latest = viewer.latest
+
+    def lapped(after=0):
+        result = latest(after)
+        for value in range(2, 2 + engine.slots):  # The engine laps the ring before the copy finishes
+            engine.publish(frame(value))
+        return result
+
+    viewer.latest = lapped
+    assert viewer.copy_latest(out) is None
+    viewer.latest = latest
+    assert viewer.copy_latest(out, after=1) == 1 + engine.slots
+
+
+def test_keys_reach_the_engine_once(rings):
+    engine, viewer = rings
+    assert engine.poll_key() == -1
+    viewer.send_key(ord("q"))
+    assert engine.poll_key() == ord("q")
+    assert engine.poll_key() == -1
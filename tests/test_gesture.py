@@ -0,0 +1,25 @@
+import numpy as np
+
+from core.gesture import NUM_LANDMARKS, fingers_up_array
+
+
+def make_hand(cx, cy, up=(1, 1, 1, 1), pinch=False):
+    """Normalized landmarks of a hand with its palm around (cx, cy) and the given fingers up."""
+    hand = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    hand[:, 0], hand[:, 1] = cx, cy
+    hand[0, :2] = cx, cy + 0.1  # Wrist
+    for i, mcp in enumerate((5, 9, 13, 17)):
+        x = cx - 0.045 + 0.03 * i
+        hand[mcp:mcp + 3, 0] = x
+        hand[mcp:mcp + 3, 1] = cy, cy - 0.03, cy - 0.05
+        hand[mcp + 3, :2] = x, cy - 0.1 if up[i] else cy - 0.01
+    hand[1:5, :2] = cx - 0.06, cy + 0.05  # Thumb folded against the palm
+    if pinch:
+        hand[4] = hand[8]
+    return hand
+
+
+def test_fingers_up_for_open_hand_and_fist():
+    hands = np.stack([make_hand(0.5, 0.5), make_hand(0.5, 0.5, up=(0, 0, 0, 0))])
+
+    assert fingers_up_array(hands)[:, 1:].tolist() == [[1, 1, 1, 1], [0, 0, 0, 0]]
@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from core.menu import Menu
+
+
+def write_catalog(path, price, mtime):
+    with open(path, "w") as file:
+        json.dump({"categories": [
+            {"name": "Mains", "items": [{"id": "burger", "name": "Burger", "price": price}]},
+            {"name": "Drinks", "items": [{"id": "coke", "name": "Coke", "price": 2}]},
+        ]}, file)
+    os.utime(path, (mtime, mtime))  # File systems with coarse timestamps would hide quick edits
+
+
+def test_json_menu_reloads_when_the_file_changes(tmp_path):
+    path = str(tmp_path / "menu.json")
+    write_catalog(path, 5, 1000)
+    menu = Menu(path, reload_interval=0)
+    menu.select_category("Mains")
+    version = menu.version
+
+    assert not menu.reload_if_changed()
+    write_catalog(path, 6, 2000)
+    assert menu.reload_if_changed()
+    assert menu.prices == {"Burger": 6, "Coke": 2}
+    assert menu.version == version + 1
+    assert menu.current_items == ["Burger"]  # The selected category survives the reload
+
+
+def test_bad_json_edit_keeps_the_last_good_catalog(tmp_path):
+    path = str(tmp_path / "menu.json")
+    write_catalog(path, 5, 1000)
+    menu = Menu(path, reload_interval=0)
+
+    with open(path, "w") as file:
+        file.write('{"categories": [')
+    os.utime(path, (2000, 2000))
+    assert not menu.reload_if_changed()
+    assert not menu.reload_if_changed()  # Not retried until the file changes again
+    assert menu.prices == {"Burger": 5, "Coke": 2}
+
+    write_catalog(path, 7, 3000)
+    assert menu.reload_if_changed()
+    assert menu.prices["Burger"] == 7
+
+
+def test_reload_interval_limits_checks(tmp_path):
+    path = str(tmp_path / "menu.json")
+    write_catalog(path, 5, 1000)
+    menu = Menu(path, reload_interval=3600)
+    assert not menu.reload_if_changed()  # Checks the file and starts the interval
+
+    write_catalog(path, 6, 2000)
+    assert not menu.reload_if_changed()
+    assert menu.prices["Burger"] == 5
+
+
+@pytest.fixture
+def menu_db(tmp_path):
+    path = str(tmp_path / "menu.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE menu_items (id TEXT PRIMARY KEY, name TEXT, category TEXT, price REAL)")
+    conn.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, item TEXT)")
+    conn.executemany("INSERT INTO menu_items VALUES (?, ?, ?, ?)",
+                     [("burger", "Burger", "Mains", 5), ("coke", "Coke", "Drinks", None)])
+    conn.commit()
+    yield path, conn
+    conn.close()
+
+
+def test_sqlite_menu_reloads_on_menu_edits_only(menu_db):
+    path, conn = menu_db
+    menu = Menu(path, reload_interval=0)
+    assert menu.prices == {"Burger": 5, "Coke": 0}
+    version = menu.version
+
+    conn.execute("INSERT INTO orders (item) VALUES ('Burger')")
+    conn.commit()
+    assert not menu.reload_if_changed()  # Another table changed; the menu rows did not
+    assert menu.version == version
+
+    conn.execute("UPDATE menu_items SET price = 6 WHERE id = 'burger'")
+    conn.commit()  # Still in the WAL, so the file mtime alone would not tell
+    assert menu.reload_if_changed()
+    assert menu.prices["Burger"] == 6
+    assert not menu.reload_if_changed()
+    menu.close()
+
+
+def test_bad_sqlite_edit_keeps_the_last_good_catalog(menu_db):
+    path, conn = menu_db
+    menu = Menu(path, reload_interval=0)
+
+    conn.execute("ALTER TABLE menu_items RENAME TO menu_items_old")
+    conn.commit()
+    assert not menu.reload_if_changed()
+    assert menu.prices == {"Burger": 5, "Coke": 0}
+
+    conn.execute("ALTER TABLE menu_items_old RENAME TO menu_items")
+    conn.execute("UPDATE menu_items SET price = 3 WHERE id = 'coke'")
+    conn.commit()
+    assert menu.reload_if_changed()
+    assert menu.prices["Coke"] == 3
+    menu.close()
+
+
+def test_table_name_is_validated():
+    with pytest.raises(ValueError):
+        Menu("menu.db", table='menu"; DROP TABLE orders; --')
@@ -0,0 +1,117 @@
+import pytest
+
+from core.order import Order
+
+
+def test_add_item_accumulates_quantity_and_total():
+    order = Order()
+    order.add_item("Burger", price=5)
+    order.add_item("Burger", price=5)
+    order.add_item("Coke", quantity=3, price=2)
+
+    assert order.quantities == {"Burger": 2, "Coke": 3}
+    assert order.total_items == 5
+    assert order.total == 16
+    assert len(order) == 2
+    assert "Coke" in order
+
+
+def test_price_falls_back_to_order_then_catalog_then_zero():
+    order = Order({"Fries": 3})
+    order.add_item("Fries")
+    order.add_item("Water")
+    order.add_item("Fries", price=100)  # The price already in the order wins
+
+    assert list(order.items()) == [("Fries", 2, 3), ("Water", 1, 0)]
+    assert order.total == 6
+
+
+def test_decrement_drops_item_at_zero():
+    order = Order()
+    order.add_item("Burger", quantity=2, price=5)
+
+    assert order.decrement("Burger")
+    assert order.quantities == {"Burger": 1}
+    assert order.decrement("Burger", quantity=5)  # Clamped to the quantity ordered
+    assert "Burger" not in order
+    assert order.total == 0
+    assert order.total_items == 0
+    assert not order.decrement("Burger")
+
+
+def test_delete_item_removes_every_unit():
+    order = Order()
+    order.add_item("Burger", quantity=3, price=5)
+    order.add_item("Coke", price=2)
+
+    assert order.delete_item("Burger")
+    assert not order.delete_item("Burger")
+    assert order.to_dict() == {"Coke": {"quantity": 1, "price": 2}}
+    assert order.total == 2
+
+
+def test_remove_item_reports_missing_item(capsys):
+    order = Order()
+    order.remove_item("Pizza")
+
+    assert "not in order" in capsys.readouterr().out
+
+
+def test_total_does_not_drift_with_float_prices():
+    order = Order()
+    for _ in range(3):
+        order.add_item("Tea", price=1.1)
+
+    assert order.total == 3.3
+    assert order.total_cents == 330
+    order.decrement("Tea")
+    assert order.total == 2.2
+
+
+def test_item_at_follows_insertion_order():
+    order = Order()
+    for item in ("Burger", "Coke", "Fries"):
+        order.add_item(item, price=1)
+    order.add_item("Burger", price=1)
+
+    assert [order.item_at(i) for i in range(4)] == ["Burger", "Coke", "Fries", None]
+    assert order.item_at(-1) is None
+
+
+def test_version_changes_on_every_change():
+    order = Order()
+    versions = [order.version]
+    order.add_item("Burger", price=5)
+    versions.append(order.version)
+    order.decrement("Burger")
+    versions.append(order.version)
+    order.clear()
+    versions.append(order.version)
+
+    assert versions == sorted(set(versions))
+    assert not order
+    assert order.total == 0
+
+
+def test_dict_round_trip():
+    order = Order()
+    order.add_item("Burger", quantity=2, price=5.5)
+    order.add_item("Coke", price=2)
+
+    copy = Order.from_dict(order.to_dict())
+    assert copy.to_records() == [("Burger", 2, 5.5), ("Coke", 1, 2)]
+    assert copy.total == 13
+    assert copy.order_items == ["Burger", "Burger", "Coke"]
+
+
+def test_quantities_below_one_are_rejected():
+    order = Order()
+    order.add_item("Burger", quantity=2, price=5)
+
+    for quantity in (0, -2):
+        with pytest.raises(ValueError):
+            order.add_item("Coke", quantity=quantity, price=2)
+        with pytest.raises(ValueError):
+            order.decrement("Burger", quantity)
+    assert order.to_dict() == {"Burger": {"quantity": 2, "price": 5}}
+    assert order.total == 10
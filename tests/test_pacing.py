@@ -0,0 +1,28 @@
+from core.pacing import QUALITY_DROP_FRAMES, QUALITY_FULL, FramePacer
+
+
+def run(pacer, frame_time, frames):
+    for _ in range(frames):
+        pacer._observe(frame_time)
+
+
+def test_sheds_under_load_and_recovers_when_load_drops():
+    pacer = FramePacer(30)
+    run(pacer, 0.05, 200)
+    assert pacer.quality == QUALITY_DROP_FRAMES
+    assert pacer.budget == 2 * pacer.period  # 50 ms fits the doubled budget, so it stays put
+
+    run(pacer, 0.02, 500)
+    assert pacer.quality == QUALITY_FULL
+
+
+def test_borderline_load_backs_off_between_restores():
+    pacer = FramePacer(30)
+    qualities = []
+    for _ in range(3000):
+        pacer._observe(0.04)  # Under the doubled budget, over the single one
+        qualities.append(pacer.quality)
+
+    changes = sum(a != b for a, b in zip(qualities, qualities[1:]))
+    assert changes < 20
+    assert max(qualities[-1000:]) > QUALITY_DROP_FRAMES  # Restores are still attempted
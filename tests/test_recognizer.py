@@ -0,0 +1,43 @@
+import numpy as np
+
+from core.gesture import NUM_LANDMARKS
+from core.recognizer import GestureRecognizer
+from test_gesture import make_hand
+
+FRAME = 1 / 30
+
+
+def recognize(recognizer, frames):
+    gestures = []
+    for i, hands in enumerate(frames):
+        gestures += recognizer.update(np.array(hands, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3), i * FRAME)
+    return [gesture.kind for gesture in gestures]
+
+
+def test_swipe_is_recognized_once():
+    frames = [[make_hand(0.2 + i * 0.04, 0.5)] for i in range(15)]
+
+    assert recognize(GestureRecognizer(), frames) == ["swipe_right"]
+
+
+def test_still_hands_in_changing_order_do_not_swipe():
+    left, right = make_hand(0.3, 0.5), make_hand(0.7, 0.5)
+    frames = [[left, right] if (i // 4) % 2 == 0 else [right, left] for i in range(60)]
+
+    assert recognize(GestureRecognizer(), frames) == []
+
+
+def test_pinch_is_latched_until_released():
+    frames = ([[make_hand(0.5, 0.5, pinch=True)]] * 10 + [[make_hand(0.5, 0.5)]] * 5
+              + [[make_hand(0.5, 0.5, pinch=True)]] * 10)
+
+    assert recognize(GestureRecognizer(), frames) == ["pinch", "pinch"]
+
+
+def test_fist_must_be_held():
+    fist = make_hand(0.5, 0.5, up=(0, 0, 0, 0))
+    recognizer = GestureRecognizer(fist_hold=0.6)
+
+    assert recognize(recognizer, [[fist]] * 10) == []  # About 0.3 s
+    recognizer.reset()
+    assert recognize(recognizer, [[fist]] * 30) == ["fist"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from core.gesture import NUM_LANDMARKS
+from core.recording import INDEX_FINGER_TIP, LandmarkRecorder, LandmarkRecording, replay_recording
+
+FRAME = 1 / 30
+WIDTH, HEIGHT = 640, 480
+
+
+def pointing_at(x, y):
+    """One hand with its index fingertip at pixel (x, y)."""
+    hand = np.full((1, NUM_LANDMARKS, 3), 0.5, dtype=np.float32)
+    hand[0, INDEX_FINGER_TIP, :2] = x / WIDTH, y / HEIGHT
+    return hand
+
+
+def test_recording_round_trip(tmp_path):
+    path = str(tmp_path / "session.ttlm")
+    three_hands = np.random.default_rng(0).random((3, NUM_LANDMARKS, 3), dtype=np.float32)
+    with LandmarkRecorder(path) as recorder:
+        recorder.record(0.0, three_hands, ["Left", "Right", "Left"], (HEIGHT, WIDTH, 3))
+        recorder.record(FRAME, three_hands[:0])
+        recorder.record(2 * FRAME, three_hands[1:2], ["Right"])
+
+    recording = LandmarkRecording(path)
+    assert recording.frame_size == (WIDTH, HEIGHT)
+    assert len(recording) == 3
+    frames = list(recording)
+    assert [(t, len(landmarks), labels) for t, landmarks, labels in frames] == [
+        (0.0, 2, ["Left", "Right"]),  # Hands beyond max_hands are dropped
+        (FRAME, 0, []),
+        (2 * FRAME, 1, ["Right"]),
+    ]
+    np.testing.assert_array_equal(frames[0][1], three_hands[:2])
+    np.testing.assert_array_equal(frames[2][1], three_hands[1:2])
+    assert len(recording.between(FRAME, 1.0)) == 2
+    assert recording.duration == pytest.approx(2 * FRAME)
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    path = str(tmp_path / "session.ttlm")
+    with LandmarkRecorder(path, frame_size=(WIDTH, HEIGHT)) as recorder:
+        for i in range(5):
+            recorder.record(i * FRAME, pointing_at(100, 100), ["Right"])
+    with open(path, "ab") as file:
+        file.write(b"\x00" * 17)  # Part of a sixth record, as after a crash
+
+    recording = LandmarkRecording(path)
+    assert len(recording) == 5
+    assert [t for t, _, _ in recording] == [i * FRAME for i in range(5)]
+
+
+def test_not_a_recording_is_rejected(tmp_path):
+    path = tmp_path / "session.ttlm"
+    path.write_bytes(b"RIFF" + b"\x00" * 40)
+
+    with pytest.raises(ValueError):
+        LandmarkRecording(str(path))
+
+
+def test_replay_drives_the_tray_like_a_live_session(tmp_path):
+    from main1 import TouchlessTray
+
+    path = str(tmp_path / "session.ttlm")
+    with LandmarkRecorder(path, frame_size=(WIDTH, HEIGHT)) as recorder:
+        for i in range(60):  # Two seconds on "Start Order", then the hand leaves
+            recorder.record(i * FRAME, pointing_at(250, 100), ["Right"])
+        for i in range(60, 70):
+            recorder.record(i * FRAME, pointing_at(0, 0)[:0])
+
+    app = TouchlessTray()
+    report = replay_recording(path, app)
+    assert report == {"frames": 70, "seconds": report["seconds"], "exited": False}
+    assert app.current_state == "StartOrder"
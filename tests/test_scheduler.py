@@ -0,0 +1,85 @@
+import time
+
+import numpy as np
+
+from core.gesture import NUM_LANDMARKS
+from core.scheduler import MODE_CODES, InferenceScheduler
+from utils.metrics import Metrics
+
+FRAME = 1 / 30
+NO_HAND = np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+
+
+def hand_at(x):
+    return np.full((1, NUM_LANDMARKS, 3), x, dtype=np.float32)
+
+
+def run(scheduler, start, frames, landmarks):
+    """Runs frames through the scheduler; returns which ran inference and the end time."""
+    ran = []
+    t = start
+    for _ in range(frames):
+        ran.append(scheduler.should_infer(t))
+        if ran[-1]:
+            scheduler.observe(landmarks, t)
+        t += FRAME
+    return ran, t
+
+
+def test_tracking_skips_frames_between_inferences():
+    metrics = Metrics()
+    scheduler = InferenceScheduler(track_every=3, metrics=metrics)
+    ran, _ = run(scheduler, time.perf_counter(), 7, hand_at(0.5))
+
+    assert scheduler.mode == "track"
+    assert ran == [True, False, False, True, False, False, True]
+    assert metrics.gauges["inference_mode"] == MODE_CODES["track"]
+    assert metrics.gauges["inference_rate"] > 0
+
+
+def test_losing_the_hand_searches_then_idles():
+    metrics = Metrics()
+    scheduler = InferenceScheduler(idle_after=1.0, idle_hz=3.0, metrics=metrics)
+    _, t = run(scheduler, time.perf_counter(), 5, hand_at(0.5))
+
+    ran, t = run(scheduler, t, 15, NO_HAND)  # Half a second without a hand
+    assert scheduler.mode == "search"
+    assert all(ran)
+    assert metrics.gauges["inference_mode"] == MODE_CODES["search"]
+
+    ran, t = run(scheduler, t, 60, NO_HAND)
+    assert scheduler.mode == "idle"
+    assert metrics.gauges["inference_mode"] == MODE_CODES["idle"]
+    ran, t = run(scheduler, t, 90, NO_HAND)  # Three idle seconds at 3 Hz
+    assert 8 <= sum(ran) <= 10
+
+    ran, _ = run(scheduler, t, 10, hand_at(0.5))
+    assert scheduler.mode == "track"
+    assert all(ran[ran.index(True):])  # Back to every frame once a hand shows up
+
+
+def test_predict_extrapolates_from_the_last_two_results():
+    scheduler = InferenceScheduler(max_extrapolation=0.25, metrics=Metrics())
+    assert scheduler.predict(0.0) is None
+
+    scheduler.observe(hand_at(0.1), 0.9)
+    assert scheduler.predict(0.95)[0, 0, 0] == np.float32(0.1)  # One result: held
+    scheduler.observe(hand_at(0.2), 1.0)
+    np.testing.assert_allclose(scheduler.predict(1.05), hand_at(0.25), rtol=1e-5)
+    np.testing.assert_allclose(scheduler.predict(1.5), hand_at(0.2))  # Too long after the last result: held
+
+
+def test_predict_holds_without_extrapolation_or_on_a_hand_count_change():
+    scheduler = InferenceScheduler(extrapolate=False, metrics=Metrics())
+    scheduler.observe(hand_at(0.1), 0.9)
+    scheduler.observe(hand_at(0.2), 1.0)
+    np.testing.assert_allclose(scheduler.predict(1.05), hand_at(0.2))
+
+    scheduler = InferenceScheduler(metrics=Metrics())
+    scheduler.observe(hand_at(0.1), 0.9)
+    scheduler.observe(np.concatenate([hand_at(0.2), hand_at(0.8)]), 1.0)
+    assert scheduler.predict(1.05).shape == (2, NUM_LANDMARKS, 3)
+    np.testing.assert_allclose(scheduler.predict(1.05)[0], hand_at(0.2)[0])
+
+    scheduler.observe(NO_HAND, 1.1)
+    assert scheduler.predict(1.15) is None
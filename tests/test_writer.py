@@ -0,0 +1,80 @@
+import threading
+import time
+
+from core.feedback import StorageManager
+from storage.writer import _STOP, WriteBehindQueue, database_writer, log_writer
+
+
+def order(i):
+    return {"Burger": {"quantity": 1 + i % 3, "price": 5}, "id": i, "pad": "x" * 200}
+
+
+def test_write_behind_log_persists_on_close(tmp_path):
+    path = str(tmp_path / "orders.jsonl")
+    writer = log_writer(path)
+    assert all(writer.submit(order(i)) for i in range(20))
+    writer.close()
+
+    assert writer.stats["written"] == 20
+    assert StorageManager(path).count() == 20
+
+
+def test_write_behind_rejects_orders_when_sink_cannot_open(tmp_path):
+    writer = database_writer(str(tmp_path / "missing" / "orders.db"), maxsize=3)
+    writer._thread.join(5)
+
+    assert writer.error is not None
+    assert not any(writer.submit(order(i)) for i in range(4))
+    start = time.monotonic()
+    writer.close()
+    assert time.monotonic() - start < 1
+
+
+def test_write_behind_log_reports_write_errors(tmp_path):
+    writer = log_writer(str(tmp_path / "missing" / "orders.jsonl"))
+    writer.submit(order(0))
+    writer._thread.join(5)
+
+    assert writer.stats["failed"] == 1
+    assert not writer.submit(order(1))
+    writer.close()
+
+
+def list_writer(**kwargs):
+    written = []
+    return WriteBehindQueue(lambda: written, lambda sink, batch: sink.extend(batch), **kwargs), written
+
+
+def test_records_queued_behind_the_stop_marker_are_written():
+    release = threading.Event()
+    written = []
+
+    def write_batch(sink, batch):
+        release.wait(5)
+        written.extend(batch)
+
+    writer = WriteBehindQueue(lambda: None, write_batch, flush_interval=0)
+    writer.submit(0)
+    while writer.depth:  # The worker holds record 0 until released
+        time.sleep(0.001)
+    # A submit() racing close() can put its record after the stop marker
+    writer._queue.put(_STOP)
+    writer._queue.put(1)
+    release.set()
+    writer.close()
+
+    assert written == [0, 1]
+
+
+def test_close_from_a_signal_handler_during_submit_rejects_the_record():
+    writer, written = list_writer()
+    put = writer._queue.put_nowait
+
+    def interrupted_put(record):
+        writer.close()  # As the SIGTERM handler would, between the closed check and the put
+        put(record)
+
+    writer._queue.put_nowait = interrupted_put
+    assert not writer.submit(order(0))
+    assert written == []
+    assert writer.stats["submitted"] == 0
@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+
+
+class OverlayCache:
+    def __init__(self):
+        """
+        Caches the static UI layer of each screen as an image plus a mask, so the
+        rectangles and text of a screen are rasterized once instead of every frame.
+        Only the regions the layer painted (buttons, lines of text) are copied.
+        """
+        self._layers = {}
+
+    @staticmethod
+    def _rasterize(shape, draw, margin=8):
+        """
+        Renders a layer and works out which pixels it touched.
+        The layer is drawn onto a black and a white canvas; pixels that come out
+        identical on both were painted by the layer, everything else is untouched.
+        Painted pixels closer than margin are grouped into one region, so a line
+        of text becomes a single box.
+        :return: Layer, mask and a list of (y0, y1, x0, x1) painted regions.
+        """
+        dark = np.zeros(shape, dtype=np.uint8)
+        light = np.full(shape, 255, dtype=np.uint8)
+        draw(dark)
+        draw(light)
+        mask = (dark == light).all(axis=2, keepdims=True)
+        grown = cv2.dilate(mask.view(np.uint8)[..., 0], np.ones((margin, margin), dtype=np.uint8))
+        n, _, stats, _ = cv2.connectedComponentsWithStats(grown)
+        regions = [(y, y + h, x, x + w) for x, y, w, h, _ in stats[1:n].tolist()]
+        return dark, mask, regions
+
+    def composite(self, frame, screen, version, draw, masked=True):
+        """
+        Draws a screen's static layer onto the frame, one copy per painted region.
+        :param frame: BGR frame to draw onto (modified in place).
+        :param screen: Screen name; each screen keeps its own cached layer.
+        :param version: Anything that changes when the layer content changes (e.g. an order version).
+        :param draw: Function drawing the layer onto a given image; only called on a cache miss.
+        :param masked: Copy only the painted pixels. Otherwise the regions are copied whole,
+                       as opaque panels behind the text, which is much cheaper.
+        """
+        key = (version, frame.shape)
+        cached = self._layers.get(screen)
+        if cached is None or cached[0] != key:
+            cached = self._layers[screen] = (key, *self._rasterize(frame.shape, draw))
+        _, layer, mask, regions = cached
+        for y0, y1, x0, x1 in regions:
+            if masked:
+                np.copyto(frame[y0:y1, x0:x1], layer[y0:y1, x0:x1], where=mask[y0:y1, x0:x1])
+            else:
+                frame[y0:y1, x0:x1] = layer[y0:y1, x0:x1]
+
+    def invalidate(self, screen=None):
+        """
+        Drops the cached layer of one screen, or of every screen.
+        :param screen: Screen name, or None to clear the whole cache.
+        """
+        if screen is None:
+            self._layers.clear()
+        else:
+            self._layers.pop(screen, None)
+
+
+class WindowDisplay:
+    def __init__(self, window_name="Touchless Tray"):
+        """
+        Shows frames in an OpenCV window on the calling thread.
+        :param window_name: Name of the display window.
+        """
+        self.window_name = window_name
+
+    def show(self, frame):
+        """
+        Shows a frame and polls the keyboard.
+        :return: Key code, or -1 if no key was pressed.
+        """
+        cv2.imshow(self.window_name, frame)
+        key = cv2.waitKey(1)
+        return -1 if key == -1 else key & 0xFF
+
+    def wait(self, seconds):
+        """
+        Keeps handling window events for a while (the frame pacing wait).
+        :param seconds: Time to wait; under a millisecond returns at once.
+        :return: Key code, or -1 if no key was pressed.
+        """
+        if seconds < 0.001:
+            return -1
+        key = cv2.waitKey(int(seconds * 1000))
+        return -1 if key == -1 else key & 0xFF
+
+    def close(self):
+        cv2.destroyWindow(self.window_name)
@@ -0,0 +1,227 @@
+import time
+from multiprocessing import parent_process, resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x54524159  # "TRAY"
+HEADER_FIELDS = 16
+# Header slots (int64)
+_MAGIC, _SLOTS, _HEIGHT, _WIDTH, _CHANNELS, _LATEST, _CLOSED, _KEY_SEQ, _KEY = range(9)
+NO_KEY = -1
+_created = set()  # Blocks created by this process, whose tracker registration must be kept
+
+
+class SharedFrameRing:
+    def __init__(self, name, shape=None, slots=4, create=False):
+        """
+        Ring of preallocated frame slots in shared memory, written by the engine and
+        read by any number of viewer processes through zero-copy NumPy views.
+        Each slot carries a sequence number that is cleared while the slot is being
+        written, so readers can tell a complete frame from one being overwritten.
+        The header also carries a closed flag and the last key pressed in a viewer,
+        giving the engine a non-blocking input channel.
+        :param name: Shared memory block name.
+        :param shape: Frame shape (height, width, channels); required when creating.
+        :param slots: Number of frame slots; a reader has slots - 1 frames of slack.
+        :param create: Create the block (engine) instead of attaching to it (viewer).
+        """
+        if create:
+            height, width, channels = shape
+            frame_bytes = height * width * channels
+            self._shm = shared_memory.SharedMemory(name, create=True, size=self._offset(slots) + slots * frame_bytes)
+            self.header = np.ndarray((HEADER_FIELDS,), np.int64, self._shm.buf)
+            self.header[:] = 0
+            self.header[[_SLOTS, _HEIGHT, _WIDTH, _CHANNELS, _KEY]] = slots, height, width, channels, NO_KEY
+            self.header[_MAGIC] = MAGIC  # Written last: the ring is ready
+            _created.add(name)
+        else:
+            self._shm = shared_memory.SharedMemory(name)
+            if parent_process() is None and name not in _created:
+                # The creator owns the block; keep this process's tracker from unlinking it on exit
+                # (multiprocessing children share their parent's tracker and must leave it alone)
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+            self.header = np.ndarray((HEADER_FIELDS,), np.int64, self._shm.buf)
+            if self.header[_MAGIC] != MAGIC:
+                self._shm.close()
+                raise ValueError(f"Shared memory block '{name}' is not a frame ring.")
+            slots, height, width, channels = (int(v) for v in self.header[_SLOTS:_CHANNELS + 1])
+        self.name = name
+        self.owner = create
+        self.slots = slots
+        self.shape = (height, width, channels)
+        self.sequences = np.ndarray((slots,), np.int64, self._shm.buf, HEADER_FIELDS * 8)
+        self.frames = np.ndarray((slots, height, width, channels), np.uint8, self._shm.buf, self._offset(slots))
+        self._key_seq = int(self.header[_KEY_SEQ])
+
+    @staticmethod
+    def _offset(slots):
+        """Byte offset of the first frame, aligned to a cache line."""
+        return -(-(HEADER_FIELDS + slots) * 8 // 64) * 64
+
+    @classmethod
+    def attach(cls, name, timeout=None, poll_interval=0.1):
+        """
+        Attaches to an existing ring, waiting for the engine to create it.
+        :param name: Shared memory block name.
+        :param timeout: Maximum seconds to wait (None waits forever).
+        :param poll_interval: Seconds between attempts.
+        :return: A SharedFrameRing.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return cls(name)
+            except (FileNotFoundError, ValueError):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+                time.sleep(poll_interval)
+
+    # Engine side
+
+    def publish(self, frame):
+        """
+        Copies a frame into the next slot and makes it the latest frame.
+        :param frame: Uint8 array of the ring's shape.
+        :return: The frame's sequence number.
+        """
+        seq = int(self.header[_LATEST]) + 1
+        slot = (seq - 1) % self.slots
+        self.sequences[slot] = 0  # Mark the slot as being written
+        np.copyto(self.frames[slot], frame)
+        self.sequences[slot] = seq
+        self.header[_LATEST] = seq
+        return seq
+
+    def poll_key(self):
+        """
+        Returns the last key pressed in a viewer since the previous call, without blocking.
+        :return: Key code, or -1 if no key was pressed.
+        """
+        key_seq = int(self.header[_KEY_SEQ])
+        if key_seq == self._key_seq:
+            return NO_KEY
+        self._key_seq = key_seq
+        return int(self.header[_KEY])
+
+    def show(self, frame):
+        """
+        Display interface used by the frame loops: publishes the frame and polls the key channel.
+        :return: Key code, or -1 if no key was pressed.
+        """
+        self.publish(frame)
+        return self.poll_key()
+
+    def wait(self, seconds):
+        """
+        Sleeps for the frame pacing wait, then polls the key channel.
+        :return: Key code, or -1 if no key was pressed.
+        """
+        if seconds > 0:
+            time.sleep(seconds)
+        return self.poll_key()
+
+    # Viewer side
+
+    def latest(self, after=0):
+        """
+        Returns a view of the newest complete frame.
+        The view aliases shared memory; use it (or copy it) before the engine
+        laps the ring, and call is_current() afterwards to detect a torn read.
+        :param after: Sequence number of the last frame already seen.
+        :return: Tuple (seq, frame view), or None if there is no newer complete frame.
+        """
+        seq = int(self.header[_LATEST])
+        if seq <= after:
+            return None
+        slot = (seq - 1) % self.slots
+        if self.sequences[slot] != seq:
+            return None
+        return seq, self.frames[slot]
+
+    def is_current(self, seq):
+        """
+        Checks that a frame returned by latest() has not been overwritten since.
+        """
+        return self.sequences[(seq - 1) % self.slots] == seq
+
+    def copy_latest(self, out, after=0):
+        """
+        Copies the newest complete frame out of shared memory.
+        :param out: Uint8 array of the ring's shape receiving the frame.
+        :param after: Sequence number of the last frame already seen.
+        :return: The frame's sequence number, or None if there is no newer frame or
+                 the engine overwrote it during the copy (out then holds a torn frame).
+        """
+        latest = self.latest(after)
+        if latest is None:
+            return None
+        seq, view = latest
+        np.copyto(out, view)
+        return seq if self.is_current(seq) else None
+
+    def send_key(self, key):
+        """
+        Forwards a key press to the engine.
+        :param key: Key code.
+        """
+        self.header[_KEY] = key
+        self.header[_KEY_SEQ] += 1
+
+    @property
+    def closed(self):
+        """True once the engine has stopped publishing."""
+        return bool(self.header[_CLOSED])
+
+    def close(self):
+        """
+        Detaches from the ring. The engine also marks it closed, so viewers
+        exit, and removes the shared memory block.
+        """
+        if self._shm is None:
+            return
+        if self.owner:
+            self.header[_CLOSED] = 1
+        # Views must be released before the mapping can be closed
+        self.header = self.sequences = self.frames = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+            _created.discard(self.name)
+        self._shm = None
+
+
+class SharedFrameDisplay:
+    def __init__(self, name="touchless-tray", slots=4):
+        """
+        Headless replacement for an OpenCV window: frames are published to a
+        SharedFrameRing created on the first frame, when their shape is known.
+        :param name: Shared memory block name viewers attach to.
+        :param slots: Number of frame slots.
+        """
+        self.name = name
+        self.slots = slots
+        self.ring = None
+
+    def show(self, frame):
+        """
+        Publishes a frame and polls the viewer key channel.
+        :return: Key code, or -1 if no key was pressed.
+        """
+        if self.ring is None:
+            self.ring = SharedFrameRing(self.name, frame.shape, self.slots, create=True)
+        return self.ring.show(frame)
+
+    def wait(self, seconds):
+        """
+        Sleeps for the frame pacing wait, then polls the viewer key channel.
+        :return: Key code, or -1 if no key was pressed.
+        """
+        if self.ring is None:
+            time.sleep(max(0.0, seconds))
+            return NO_KEY
+        return self.ring.wait(seconds)
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,77 @@
+import cv2
+
+
+class Button:
+    def __init__(self, label, rect, color, action, text_origin=None, text_scale=1.0,
+                 text_color=(0, 0, 0), thickness=2):
+        """
+        A clickable screen region with its look and the action it triggers.
+        :param label: Text drawn on the button.
+        :param rect: Bounding box (x1, y1, x2, y2); the same box is drawn and hit-tested.
+        :param color: BGR fill color.
+        :param action: Action tuple dispatched on selection, e.g. ("goto", "MainMenu").
+        :param text_origin: Bottom-left corner of the label (defaults to a left-padded, centered baseline).
+        :param text_scale: Font scale of the label.
+        :param text_color: BGR color of the label.
+        :param thickness: Stroke thickness of the label.
+        """
+        self.label = label
+        self.rect = tuple(rect)
+        self.color = color
+        self.action = action
+        x1, y1, x2, y2 = self.rect
+        self.text_origin = text_origin or (x1 + 50, (y1 + y2) // 2 + 10)
+        self.text_scale = text_scale
+        self.text_color = text_color
+        self.thickness = thickness
+
+    def contains(self, x, y):
+        x1, y1, x2, y2 = self.rect
+        return x1 <= x < x2 and y1 <= y < y2
+
+    def draw(self, image):
+        x1, y1, x2, y2 = self.rect
+        cv2.rectangle(image, (x1, y1), (x2, y2), self.color, -1)
+        cv2.putText(image, self.label, self.text_origin, cv2.FONT_HERSHEY_SIMPLEX,
+                    self.text_scale, self.text_color, self.thickness)
+
+
+class ScreenLayout:
+    def __init__(self, buttons, cell_size=64):
+        """
+        A screen defined once as a set of buttons, shared by the renderer and hit-testing.
+        Buttons are bucketed into a uniform grid so a hit test only looks at the
+        buttons overlapping one cell, regardless of how many buttons the screen has.
+        :param buttons: Iterable of Button.
+        :param cell_size: Grid cell size in pixels.
+        """
+        self.buttons = list(buttons)
+        self.cell_size = cell_size
+        self._grid = {}
+        for button in self.buttons:
+            x1, y1, x2, y2 = button.rect
+            for cx in range(x1 // cell_size, (x2 - 1) // cell_size + 1):
+                for cy in range(y1 // cell_size, (y2 - 1) // cell_size + 1):
+                    self._grid.setdefault((cx, cy), []).append(button)
+
+    def hit_test(self, x, y):
+        """
+        Finds the button under a point.
+        :param x: X coordinate in pixels.
+        :param y: Y coordinate in pixels.
+        :return: The topmost Button containing the point, or None.
+        """
+        candidates = self._grid.get((int(x) // self.cell_size, int(y) // self.cell_size))
+        if candidates:
+            for button in reversed(candidates):
+                if button.contains(x, y):
+                    return button
+        return None
+
+    def draw(self, image):
+        """
+        Draws every button of the screen.
+        :param image: Image to draw onto.
+        """
+        for button in self.buttons:
+            button.draw(image)
@@ -0,0 +1,45 @@
+import argparse
+import logging
+
+import cv2
+import numpy as np
+
+from ui.frame_ring import SharedFrameRing
+
+
+def run_viewer(name="touchless-tray", window_name="Touchless Tray", timeout=None):
+    """
+    Shows the frames a headless engine publishes to a SharedFrameRing.
+    Runs in its own process, so window-system stalls never block the engine;
+    key presses are forwarded to the engine through the ring.
+    :param name: Shared memory block name.
+    :param window_name: Name of the display window.
+    :param timeout: Maximum seconds to wait for the engine to start (None waits forever).
+    """
+    ring = SharedFrameRing.attach(name, timeout)
+    logging.info("Viewing %s (%dx%d)", name, ring.shape[1], ring.shape[0])
+    frame = np.empty(ring.shape, dtype=np.uint8)
+    last_seq = 0
+    try:
+        while not ring.closed:
+            # A frame the engine overwrote while it was copied is skipped; the next one is newer
+            seq = ring.copy_latest(frame, last_seq)
+            if seq is not None:
+                last_seq = seq
+                cv2.imshow(window_name, frame)
+            key = cv2.waitKey(1 if seq is not None else 5)
+            if key != -1:
+                ring.send_key(key & 0xFF)
+    finally:
+        ring.close()
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Display frames published by a headless Touchless Tray.")
+    parser.add_argument("name", nargs="?", default="touchless-tray", help="Shared memory ring name.")
+    parser.add_argument("--timeout", type=float, help="Seconds to wait for the engine to start.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    run_viewer(args.name, timeout=args.timeout)
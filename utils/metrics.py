@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the cumulative Prometheus buckets, from 0.1 ms to 1 s.
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self, size=1024, buckets=DEFAULT_BUCKETS):
+        """
+        Fixed-size histogram: cumulative bucket counts plus a ring buffer of the
+        most recent samples for quantiles. Recording is O(log buckets) and never allocates.
+        :param size: Number of recent samples kept for quantiles.
+        :param buckets: Sorted bucket upper bounds in seconds.
+        """
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._recent = array("d", bytes(8 * size))
+        self._next = 0
+
+    def observe(self, value):
+        """
+        Records one sample.
+        :param value: Duration in seconds.
+        """
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self._recent[self._next % len(self._recent)] = value
+        self._next += 1
+
+    def quantiles(self, quantiles=QUANTILES):
+        """
+        Computes quantiles over the recent samples.
+        :param quantiles: Quantiles in [0, 1].
+        :return: List of values, one per quantile (zeros when empty).
+        """
+        filled = min(self._next, len(self._recent))
+        if not filled:
+            return [0.0] * len(quantiles)
+        samples = sorted(self._recent[:filled])
+        return [samples[min(filled - 1, int(q * filled))] for q in quantiles]
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metrics:
+    def __init__(self, prefix="touchless", size=1024):
+        """
+        Registry of per-stage latency histograms and gauges.
+        :param prefix: Prefix of the exported metric names.
+        :param size: Recent samples kept per stage.
+        """
+        self.prefix = prefix
+        self.size = size
+        self.histograms = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        """
+        Returns the histogram of a stage, creating it on first use.
+        """
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram(self.size))
+        return histogram
+
+    def observe(self, stage, seconds):
+        """
+        Records a duration for a stage.
+        :param stage: Stage name (e.g. "capture").
+        :param seconds: Duration in seconds.
+        """
+        self.histogram(stage).observe(seconds)
+
+    def timer(self, stage):
+        """
+        Context manager timing a block into a stage histogram.
+        """
+        return _Timer(self.histogram(stage))
+
+    def set_gauge(self, name, value):
+        """
+        Sets a point-in-time value (e.g. a queue depth).
+        """
+        self.gauges[name] = value
+
+    def snapshot(self):
+        """
+        Summarizes every stage and gauge.
+        :return: Dict with "stages" (count, sum and recent p50/p95/p99 in seconds) and "gauges".
+        """
+        stages = {}
+        for stage, histogram in list(self.histograms.items()):
+            p50, p95, p99 = histogram.quantiles()
+            stages[stage] = {"count": histogram.count, "sum": histogram.sum, "p50": p50, "p95": p95, "p99": p99}
+        return {"timestamp": time.time(), "stages": stages, "gauges": dict(self.gauges)}
+
+    def render_prometheus(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+        :return: The exposition text.
+        """
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent per pipeline stage.", f"# TYPE {name} histogram"]
+        recent = []
+        # Other threads may add stages and gauges while this runs, so iterate over copies
+        for stage, histogram in sorted(list(self.histograms.items())):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for quantile, value in zip(QUANTILES, histogram.quantiles()):
+                recent.append(f'{self.prefix}_stage_recent_seconds{{stage="{stage}",quantile="{quantile}"}} {value}')
+            recent.append(f'{self.prefix}_stage_recent_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+            recent.append(f'{self.prefix}_stage_recent_seconds_count{{stage="{stage}"}} {histogram.count}')
+        if recent:
+            lines.append(f"# HELP {self.prefix}_stage_recent_seconds Quantiles over the most recent samples.")
+            lines.append(f"# TYPE {self.prefix}_stage_recent_seconds summary")
+            lines.extend(recent)
+        for gauge, value in sorted(list(self.gauges.items())):
+            lines.append(f"# TYPE {self.prefix}_{gauge} gauge")
+            lines.append(f"{self.prefix}_{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """
+        Serves /metrics in Prometheus format from a background thread.
+        :param port: TCP port.
+        :param host: Interface to bind; localhost by default.
+        :return: The running ThreadingHTTPServer (call shutdown() to stop it).
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+    def write_snapshots(self, path, interval=10.0):
+        """
+        Periodically writes snapshot() as JSON to a file from a background thread.
+        The file is replaced atomically so readers never see a partial snapshot.
+        :param path: Destination file.
+        :param interval: Seconds between snapshots.
+        :return: Event; set it to stop writing.
+        """
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w") as file:
+                    json.dump(self.snapshot(), file)
+                os.replace(tmp_path, path)
+
+        threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+        return stop
+
+
+# Process-wide registry used by the app and the persistence worker
+METRICS = Metrics()